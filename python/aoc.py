@@ -0,0 +1,268 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import sidecar
+from cache import AnswerCache
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CACHE_DIR: str = os.path.join(ROOT, ".aoc_cache")
+
+
+class Day:
+    number: int
+    # file name for each part, per mode, relative to that mode's input root
+    files: Dict[str, Dict[int, str]]
+    # known answers for each part, per mode
+    expected: Dict[str, Dict[int, Any]]
+    # turns (module, file name, part) into the arguments of partN
+    prepare: Callable[[ModuleType, str, int], Tuple]
+
+    def __init__(self, number: int, files: Dict[str, Dict[int, str]],
+                 expected: Dict[str, Dict[int, Any]],
+                 prepare: Optional[Callable[[ModuleType, str, int], Tuple]] = None):
+        self.number = number
+        self.files = files
+        self.expected = expected
+        self.prepare = prepare or (
+            lambda module, file_name, part: (module.read_data(file_name),))
+
+    @property
+    def name(self) -> str:
+        return f"day{self.number:02}"
+
+    @property
+    def module(self) -> ModuleType:
+        return importlib.import_module(self.name)
+
+    def solve(self, file_name: str, part: int) -> Any:
+        module = self.module
+        args = self.prepare(module, file_name, part)
+        return getattr(module, f"part{part}")(*args)
+
+
+def same_files(name: str, test: str = "test") -> Dict[str, Dict[int, str]]:
+    return {
+        "input": {1: f"{name}.input", 2: f"{name}.input"},
+        "test": {1: f"{name}.{test}", 2: f"{name}.{test}"},
+    }
+
+
+def prepare_day01(module: ModuleType, file_name: str, part: int) -> Tuple:
+    left_list, right_list = module.read_data(file_name)
+    module.sort_lists(left_list, right_list)
+    return (left_list, right_list)
+
+
+def prepare_day05(module: ModuleType, file_name: str, part: int) -> Tuple:
+    rules, updates = module.read_data(file_name)
+    return (updates, rules)
+
+
+def prepare_day11(module: ModuleType, file_name: str, part: int) -> Tuple:
+    return (module.read_data(file_name), 25 if part == 1 else 75)
+
+
+DAYS: Dict[int, Day] = {
+    1: Day(1, same_files("day01"),
+           {"input": {1: 1258579, 2: 23981443}, "test": {1: 11, 2: 31}},
+           prepare_day01),
+    2: Day(2, same_files("day02"),
+           {"input": {1: 606, 2: 644}, "test": {1: 2, 2: 4}}),
+    3: Day(3, {"input": {1: "day03.input", 2: "day03.input"},
+               "test": {1: "day03.test1", 2: "day03.test2"}},
+           {"input": {1: 173731097, 2: 93729253}, "test": {1: 161, 2: 48}}),
+    4: Day(4, same_files("day04"),
+           {"input": {1: 2496, 2: 1967}, "test": {1: 18, 2: 9}}),
+    5: Day(5, same_files("day05"),
+           {"input": {1: 5166, 2: 4679}, "test": {1: 143, 2: 123}},
+           prepare_day05),
+    6: Day(6, same_files("day06"),
+           {"input": {1: 5409, 2: 2022}, "test": {1: 41, 2: 6}}),
+    7: Day(7, same_files("day07"),
+           {"input": {1: 882304362421, 2: 145149066755184},
+            "test": {1: 3749, 2: 11387}}),
+    8: Day(8, same_files("day08"),
+           {"input": {1: 256, 2: 1005}, "test": {1: 14, 2: 34}}),
+    9: Day(9, same_files("day09"),
+           {"input": {1: 6330095022244, 2: 6359491814941},
+            "test": {1: 1928, 2: 2858}}),
+    10: Day(10, same_files("day10"),
+            {"input": {1: 646, 2: 1494}, "test": {1: 36, 2: 81}}),
+    11: Day(11, same_files("day11"),
+            {"input": {1: 185894, 2: 221632504974231}, "test": {1: 55312}},
+            prepare_day11),
+    12: Day(12, same_files("day12"),
+            {"input": {1: 1465112, 2: 893790}, "test": {1: 1930, 2: 1206}}),
+}
+
+
+class Result:
+    day: Day
+    part: int
+    file_name: str
+    answer: Any
+    seconds: float
+    # peak resident set size while running this part, in KiB, or of the
+    # whole process so far where the peak cannot be reset (part_peak False)
+    peak_rss: Optional[int]
+    part_peak: bool
+    # for an answer from the cache, the time it originally took to compute
+    computed_seconds: Optional[float]
+
+    def __init__(self, day: Day, part: int, file_name: str, answer: Any,
+                 seconds: float, peak_rss: Optional[int], part_peak: bool,
+                 computed_seconds: Optional[float] = None):
+        self.day = day
+        self.part = part
+        self.file_name = file_name
+        self.answer = answer
+        self.seconds = seconds
+        self.peak_rss = peak_rss
+        self.part_peak = part_peak
+        self.computed_seconds = computed_seconds
+
+    @property
+    def cached(self) -> bool:
+        return self.computed_seconds is not None
+
+    @property
+    def saved(self) -> float:
+        if self.computed_seconds is None:
+            return 0.0
+        return max(0.0, self.computed_seconds - self.seconds)
+
+    def status(self, mode: str) -> str:
+        expected = self.day.expected.get(mode, {}).get(self.part)
+        if expected is None:
+            return "-"
+        return "ok" if expected == self.answer else f"FAIL (expected {expected})"
+
+    def __repr__(self) -> str:
+        rss = "-" if self.peak_rss is None else f"{self.peak_rss / 1024:.1f} MiB"
+        line = (f"{self.day.name} part{self.part}  {self.answer!s:>18}  "
+                f"{self.seconds * 1000:10.2f} ms  "
+                f"{'peak' if self.part_peak else 'max'} {rss:>10}")
+        if self.cached:
+            line += f"  cached, saved {self.saved * 1000:.2f} ms"
+        return line
+
+
+def reset_peak_rss() -> bool:
+    # linux lets a process reset its own high-water mark; elsewhere the
+    # peak only ever grows over the whole run
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def input_path(day: Day, part: int, mode: str, roots: Dict[str, str]) -> str:
+    return os.path.join(roots[mode], day.files[mode][part])
+
+
+def run_part(day: Day, part: int, file_name: str,
+             cache: Optional[AnswerCache] = None) -> Result:
+    part_peak = reset_peak_rss()
+    start = time.perf_counter()
+    key: Optional[str] = None
+    if cache is not None:
+        key = cache.key(day.name, part, file_name, day.module, day.prepare)
+        entry = cache.get(key)
+        if entry is not None:
+            return Result(day, part, file_name, entry["answer"],
+                          time.perf_counter() - start, peak_rss(), part_peak,
+                          entry["seconds"])
+    answer = day.solve(file_name, part)
+    seconds = time.perf_counter() - start
+    if key is not None:
+        cache.put(key, answer, seconds)
+    return Result(day, part, file_name, answer, seconds, peak_rss(), part_peak)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="aoc", description="Run advent of code days in one interpreter")
+    parser.add_argument("days", nargs="*", type=int, default=sorted(DAYS),
+                        help="days to run (default: all)")
+    parser.add_argument("-p", "--part", dest="parts", type=int, nargs="+",
+                        choices=[1, 2], default=[1, 2])
+    parser.add_argument("-m", "--mode", choices=["test", "input"],
+                        default="test")
+    parser.add_argument("--inputs", default=os.path.join(ROOT, "inputs"),
+                        help="directory holding the dayNN.input files")
+    parser.add_argument("--tests", default=os.path.join(ROOT, "tests"),
+                        help="directory holding the dayNN test files")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always compute and parse, neither reading nor "
+                        "storing answers or parsed inputs")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="directory holding the cached answers and "
+                        "parsed inputs")
+    parser.add_argument("--cache-size", type=float, default=16,
+                        help="MiB of cached answers and parsed inputs kept "
+                        "before the least recently used are evicted")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    roots: Dict[str, str] = {"input": args.inputs, "test": args.tests}
+    cache: Optional[AnswerCache] = None
+    if not args.no_cache:
+        cache = AnswerCache(args.cache_dir, int(args.cache_size * 1024 * 1024))
+        sidecar.enabled = True
+        sidecar.SIDECAR_DIR = os.path.join(args.cache_dir, "parsed")
+    failed: int = 0
+    saved: float = 0.0
+    for number in args.days:
+        if number not in DAYS:
+            print(f"day{number:02} has no python solution", file=sys.stderr)
+            failed += 1
+            continue
+        day = DAYS[number]
+        for part in args.parts:
+            try:
+                result = run_part(day, part,
+                                  input_path(day, part, args.mode, roots), cache)
+            except Exception as error:
+                print(f"{day.name} part{part}  error: {error!r}")
+                failed += 1
+                continue
+            status = result.status(args.mode)
+            if status.startswith("FAIL"):
+                failed += 1
+            saved += result.saved
+            print(f"{result}  {status}")
+    if saved:
+        print(f"cache saved {saved * 1000:.2f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,246 @@
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import sidecar
+from aoc import DAYS, ROOT, Day, input_path
+
+
+HISTORY_FILE: str = os.path.join(ROOT, "bench_history.json")
+
+
+def time_part(day: Day, part: int, file_name: str, warmup: int, repeat: int) -> List[float]:
+    for _ in range(warmup):
+        day.solve(file_name, part)
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        day.solve(file_name, part)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings: List[float], fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    return {
+        "median": statistics.median(timings),
+        "p95": percentile(timings, 0.95),
+        "runs": len(timings),
+    }
+
+
+def load_history(file_name: str) -> List[Dict]:
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name, "r") as file:
+        return json.load(file)
+
+
+def save_history(file_name: str, history: List[Dict]) -> None:
+    with open(file_name, "w") as file:
+        json.dump(history, file, indent=1)
+
+
+def baseline_medians(history: List[Dict], window: int) -> Dict[str, float]:
+    # median of the last window recorded medians of every benchmark key, so
+    # a single noisy run neither fails the next one nor becomes the baseline
+    recorded: Dict[str, List[float]] = {}
+    for entry in history:
+        for key, stats in entry["results"].items():
+            recorded.setdefault(key, []).append(stats["median"])
+    return {key: statistics.median(medians[-window:])
+            for key, medians in recorded.items()}
+
+
+def read_input(day: Day, file_name: str) -> None:
+    data = day.module.read_data(file_name)
+    # generators only parse as they are consumed
+    if hasattr(data, "__next__"):
+        for _ in data:
+            pass
+
+
+def parse_times(day: Day, file_name: str, repeat: int) -> Dict[str, float]:
+    # median time to read the input from text, the first time with a sidecar
+    # (parse and write it) and once the sidecar exists
+    times: Dict[str, List[float]] = {"text": [], "cold": [], "warm": []}
+    directory, enabled = sidecar.SIDECAR_DIR, sidecar.enabled
+    try:
+        for _ in range(repeat):
+            sidecar.enabled = False
+            start = time.perf_counter()
+            read_input(day, file_name)
+            times["text"].append(time.perf_counter() - start)
+            sidecar.enabled = True
+            with tempfile.TemporaryDirectory() as temporary:
+                sidecar.SIDECAR_DIR = temporary
+                for kind in ("cold", "warm"):
+                    start = time.perf_counter()
+                    read_input(day, file_name)
+                    times[kind].append(time.perf_counter() - start)
+    finally:
+        sidecar.enabled = enabled
+        sidecar.SIDECAR_DIR = directory
+    return {kind: statistics.median(timings) for kind, timings in times.items()}
+
+
+def tile_grid(text: str, times: int) -> str:
+    rows = [row for row in text.splitlines() if len(row.strip()) != 0]
+    return "\n".join(row * times for _ in range(times) for row in rows) + "\n"
+
+
+def tile_lab(text: str, times: int) -> str:
+    # only the guard in the first tile may stay on the map
+    tiled = tile_grid(text, times).replace("^", ".")
+    row = next(idx for idx, line in enumerate(text.splitlines()) if "^" in line)
+    col = text.splitlines()[row].index("^")
+    width = len(text.splitlines()[0]) * times + 1
+    offset = row * width + col
+    return tiled[:offset] + "^" + tiled[offset + 1:]
+
+
+def repeat_disk(text: str, times: int) -> str:
+    # an empty gap keeps the file/free alternation between copies
+    disk = text.strip()
+    if len(disk) % 2 == 0:
+        disk = disk[:-1]
+    return "0".join([disk] * times) + "\n"
+
+
+SCALERS: Dict[int, Callable[[str, int], str]] = {
+    4: tile_grid,
+    6: tile_lab,
+    9: repeat_disk,
+    10: tile_grid,
+}
+
+
+def scaling(day: Day, part: int, file_name: str, factors: List[int],
+            repeat: int) -> List[Dict[str, float]]:
+    with open(file_name, "r") as file:
+        text = file.read()
+    points: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for factor in factors:
+            scaled_file = os.path.join(directory, f"{day.name}.x{factor}")
+            with open(scaled_file, "w") as file:
+                file.write(SCALERS[day.number](text, factor))
+            timings = time_part(day, part, scaled_file, 0, repeat)
+            points.append({"factor": factor,
+                           "size": os.path.getsize(scaled_file),
+                           "median": statistics.median(timings)})
+    return points
+
+
+def growth(points: List[Dict[str, float]]) -> Optional[float]:
+    # exponent k of time ~ size^k between the smallest and largest input
+    first, last = points[0], points[-1]
+    if last["size"] == first["size"] or first["median"] <= 0:
+        return None
+    return (math.log(last["median"] / first["median"])
+            / math.log(last["size"] / first["size"]))
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="bench", description="Benchmark advent of code days")
+    parser.add_argument("days", nargs="*", type=int, default=sorted(DAYS))
+    parser.add_argument("-p", "--part", dest="parts", type=int, nargs="+",
+                        choices=[1, 2], default=[1, 2])
+    parser.add_argument("-m", "--mode", dest="modes", nargs="+",
+                        choices=["test", "input"], default=["test", "input"])
+    parser.add_argument("--inputs", default=os.path.join(ROOT, "inputs"))
+    parser.add_argument("--tests", default=os.path.join(ROOT, "tests"))
+    parser.add_argument("-w", "--warmup", type=int, default=1)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--history", default=HISTORY_FILE,
+                        help="json file the timings are appended to")
+    parser.add_argument("--no-save", action="store_true",
+                        help="compare against the history without recording; "
+                        "runs with a regression are never recorded")
+    parser.add_argument("-t", "--threshold", type=float, default=0.25,
+                        help="allowed slowdown of the median, as a fraction")
+    parser.add_argument("--window", type=int, default=5,
+                        help="recorded runs whose medians make the baseline")
+    parser.add_argument("-s", "--scale", dest="factors", type=int, nargs="+",
+                        help="also time tiled/repeated inputs of the scalable "
+                        "days at these factors")
+    parser.add_argument("--parse", action="store_true",
+                        help="also time reading each input as text, parsed "
+                        "into a new sidecar and from an existing sidecar")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    roots: Dict[str, str] = {"input": args.inputs, "test": args.tests}
+    history = load_history(args.history)
+    previous = baseline_medians(history, args.window)
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: List[str] = []
+    missing: int = 0
+    for number in args.days:
+        if number not in DAYS:
+            print(f"day{number:02} has no python solution", file=sys.stderr)
+            missing += 1
+            continue
+        day = DAYS[number]
+        for mode in args.modes:
+            for part in args.parts:
+                key = f"{day.name}/part{part}/{mode}"
+                timings = time_part(day, part,
+                                    input_path(day, part, mode, roots),
+                                    args.warmup, args.repeat)
+                stats = summarize(timings)
+                results[key] = stats
+                line = (f"{key:<20} median {stats['median'] * 1000:10.3f} ms"
+                        f"  p95 {stats['p95'] * 1000:10.3f} ms")
+                if key in previous:
+                    change = stats["median"] / previous[key] - 1
+                    line += f"  {change:+7.1%}"
+                    if change > args.threshold:
+                        regressions.append(key)
+                        line += "  REGRESSION"
+                print(line)
+        if args.parse:
+            for mode in args.modes:
+                times = parse_times(day, input_path(day, 1, mode, roots), args.repeat)
+                print(f"{day.name}/parse/{mode:<9} text {times['text'] * 1000:10.3f} ms"
+                      f"  cold {times['cold'] * 1000:10.3f} ms"
+                      f"  warm {times['warm'] * 1000:10.3f} ms")
+        if args.factors and number in SCALERS:
+            for part in args.parts:
+                points = scaling(day, part,
+                                 input_path(day, part, "input", roots),
+                                 args.factors, args.repeat)
+                for point in points:
+                    print(f"{day.name}/part{part} x{point['factor']:<4} "
+                          f"{point['size']:>10} bytes  "
+                          f"median {point['median'] * 1000:10.3f} ms")
+                exponent = growth(points)
+                if exponent is not None:
+                    print(f"{day.name}/part{part} grows as size^{exponent:.2f}")
+    # a regressing run is not recorded, it would drag the baseline along
+    if not args.no_save and not regressions:
+        history.append({"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "results": results})
+        save_history(args.history, history)
+    if regressions:
+        print(f"{len(regressions)} regression(s) past {args.threshold:.0%}: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
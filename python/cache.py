@@ -0,0 +1,131 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+
+def file_digest(file_name: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_files(module: ModuleType) -> List[str]:
+    # the solver module and every module next to it that it uses, directly
+    # or through another one, so an edit to a shared helper such as grid.py
+    # or the sidecar loader behind ints.py also changes the key
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    files = {os.path.abspath(module.__file__)}
+    pending = [module]
+    while pending:
+        for value in vars(pending.pop()).values():
+            used = value if isinstance(value, ModuleType) else inspect.getmodule(value)
+            file_name = getattr(used, "__file__", None)
+            if not file_name:
+                continue
+            file_name = os.path.abspath(file_name)
+            if os.path.dirname(file_name) == directory and file_name not in files:
+                files.add(file_name)
+                pending.append(used)
+    return sorted(files)
+
+
+def function_source(function: Callable) -> str:
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return ""
+
+
+class AnswerCache:
+    # answers stored as one small json file per key, evicting the least
+    # recently used files once the store grows past max_bytes
+    directory: str
+    max_bytes: int
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, name: str, part: int, file_name: str, module: ModuleType,
+            prepare: Optional[Callable] = None) -> str:
+        # hash of the input, the day and part, and everything that
+        # computes the answer from it
+        digest = hashlib.sha256(f"{name}/part{part}\n".encode())
+        digest.update(file_digest(file_name).encode())
+        for source in source_files(module):
+            with open(source, "rb") as file:
+                digest.update(file.read())
+        if prepare is not None:
+            digest.update(function_source(prepare).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        # {"answer": ..., "seconds": time it took to compute}, or None
+        path = self.path(key)
+        try:
+            with open(path, "r") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # the modification time is the last use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, answer: Any, seconds: float) -> None:
+        # a directory that cannot be written only means running uncached
+        try:
+            text = json.dumps({"answer": answer, "seconds": seconds})
+        except TypeError:  # not an answer json can hold
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # written aside and moved in place, so readers never see half a file
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, "w") as file:
+                file.write(text)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        # the budget also covers the parsed input sidecars kept beneath
+        # the directory
+        entries = []
+        try:
+            for directory, _, names in os.walk(self.directory):
+                for name in names:
+                    if name.endswith((".json", ".bin")):
+                        path = os.path.join(directory, name)
+                        stat = os.stat(path)
+                        entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
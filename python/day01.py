@@ -1,44 +1,86 @@
-from typing import List, Tuple
+from typing import Sequence, Tuple
+from array import array
 import os
 import sys
 
+from ints import read_ints
 
-def read_data(file_name: str) -> Tuple[List[int], List[int]]:
-    left_list: List[int] = []
-    right_list: List[int] = []
-    with open(file_name) as file:
-        lines = file.readlines()
-        for line in lines:
-            left, right = [int(word.strip()) for word in line.strip().split()]
-            left_list.append(left)
-            right_list.append(right)
-    return (left_list, right_list)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
-def part1(left_list: List[int], right_list: List[int]) -> int:
+# value ranges up to this wide are sorted by counting instead of comparing
+COUNTING_SORT_RANGE: int = 1 << 20
+
+
+def read_data(file_name: str) -> Tuple[Sequence[int], Sequence[int]]:
+    # both columns as int64 arrays with NumPy, as lists without it
+    nums = read_ints(file_name)
+    if np is not None and isinstance(nums, array):
+        pairs = np.frombuffer(nums, dtype=np.int64).reshape(-1, 2)
+        return (pairs[:, 0].copy(), pairs[:, 1].copy())
+    return (list(nums[0::2]), list(nums[1::2]))
+
+
+def counting_sort(values: "np.ndarray") -> None:
+    # in place, for values packed into a narrow range
+    low = int(values.min())
+    counts = np.bincount(values - low)
+    values[:] = np.repeat(np.arange(low, low + len(counts), dtype=values.dtype), counts)
+
+
+def sort_list(values: Sequence[int]) -> None:
+    if np is not None and isinstance(values, np.ndarray):
+        if len(values) > 0 and int(values.max()) - int(values.min()) <= COUNTING_SORT_RANGE:
+            counting_sort(values)
+        else:
+            values.sort()
+    else:
+        values.sort()
+
+
+def sort_lists(left_list: Sequence[int], right_list: Sequence[int]) -> None:
+    sort_list(left_list)
+    sort_list(right_list)
+
+
+def part1(left_list: Sequence[int], right_list: Sequence[int]) -> int:
+    # both lists sorted
+    if np is not None and isinstance(left_list, np.ndarray):
+        return int(np.abs(right_list - left_list).sum())
     total_distance = 0
-    for i in range(len(left_list)):
-        total_distance += abs(right_list[i]-left_list[i])
+    for left, right in zip(left_list, right_list):
+        total_distance += abs(right - left)
     return total_distance
 
 
-def part2(left_list: List[int], right_list: List[int]) -> int:
-    num_count = {}
-    for i in range(len(left_list)):
-        if (num_count.get(right_list[i])):
-            num_count[right_list[i]] += 1
-        else:
-            num_count[right_list[i]] = 1
+def part2(left_list: Sequence[int], right_list: Sequence[int]) -> int:
+    # both lists sorted, so equal values line up as runs in each list
+    if np is not None and isinstance(left_list, np.ndarray):
+        counts = (np.searchsorted(right_list, left_list, side="right")
+                  - np.searchsorted(right_list, left_list, side="left"))
+        return int((left_list * counts).sum())
     total_similarity = 0
-    for num in left_list:
-        if (num_count.get(num)):
-            total_similarity += num * num_count.get(num)
+    right_idx = 0
+    count = 0
+    for idx, num in enumerate(left_list):
+        if idx == 0 or num != left_list[idx - 1]:
+            while right_idx < len(right_list) and right_list[right_idx] < num:
+                right_idx += 1
+            count = 0
+            while right_idx < len(right_list) and right_list[right_idx] == num:
+                right_idx += 1
+                count += 1
+        total_similarity += num * count
     return total_similarity
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day01.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day01.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day01.input")
+    test_file: str = os.path.join(root, "tests", "day01.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     if mode.strip().lower() == "input":
@@ -46,8 +88,7 @@ if __name__ == "__main__":
     elif mode.strip().lower() == "test":
         left_list, right_list = read_data(test_file)
 
-    left_list = sorted(left_list)
-    right_list = sorted(right_list)
+    sort_lists(left_list, right_list)
 
     p1_result = part1(left_list, right_list)
     p2_result = part2(left_list, right_list)
@@ -1,49 +1,68 @@
-from typing import List
-import copy
+from typing import List, Optional, Sequence, Tuple
+from array import array
 import os
 
+from ints import read_int_rows
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def read_data(file_name: str) -> List[List[int]]:
-    records: List[List[int]] = []
-    with open(file_name, "r") as file:
-        lines: List[str] = file.readlines()
-        for line in lines:
-            record: List[int] = [int(level.strip())
-                                 for level in line.strip().split()]
-            records.append(record)
+    levels, offsets = read_int_rows(file_name)
+    records: List[List[int]] = [list(levels[offsets[idx]:offsets[idx + 1]])
+                                for idx in range(len(offsets) - 1)]
     return records
 
 
-def is_safe(record: List[int]) -> bool:
-    if len(record) < 2:
+def read_flat(file_name: str) -> Tuple[array, array]:
+    # every level of every report in one array, report i spanning
+    # levels[offsets[i]:offsets[i + 1]]
+    return read_int_rows(file_name)
+
+
+def first_bad_step(levels: Sequence[int], start: int, end: int, ascending: bool,
+                   skip: int = -1) -> Optional[Tuple[int, int]]:
+    # indices of the first adjacent pair in levels[start:end], ignoring the
+    # skipped index, that is not a 1 to 3 step in the given direction
+    previous: int = -1
+    for idx in range(start, end):
+        if idx == skip:
+            continue
+        if previous != -1:
+            diff = levels[idx] - levels[previous]
+            if not (1 <= (diff if ascending else -diff) <= 3):
+                return (previous, idx)
+        previous = idx
+    return None
+
+
+def is_safe_span(levels: Sequence[int], start: int, end: int) -> bool:
+    if end - start < 2:
         return False
-    ascending: bool = None
-    if record[0] == record[1]:
+    return (first_bad_step(levels, start, end, True) is None
+            or first_bad_step(levels, start, end, False) is None)
+
+
+def can_make_safe_span(levels: Sequence[int], start: int, end: int) -> bool:
+    # a removal that fixes the report has to take out one of the two levels
+    # of the first bad step, so at most two retries per direction
+    if end - start < 3:
         return False
-    elif record[0] < record[1]:
-        ascending = True
-    else:
-        ascending = False
-
-    left: int = 0
-    right: int = 1
-    while right < len(record):
-        if record[left] == record[right]:
-            return False
-        if not (1 <= abs(record[right] - record[left]) <= 3):
-            # print("increasing or decreasing too rapidly", file=sys.stderr)
-            return False
-        if ascending:
-            if record[left] > record[right]:
-                # print("not strictly increasing or ", file=sys.stderr)
-                return False
-        else:
-            if record[left] < record[right]:
-                # print("not strictly decreasing or ", file=sys.stderr)
-                return False
-        left += 1
-        right += 1
-    return True
+    for ascending in (True, False):
+        bad = first_bad_step(levels, start, end, ascending)
+        if bad is None:
+            return True
+        for skip in bad:
+            if first_bad_step(levels, start, end, ascending, skip) is None:
+                return True
+    return False
+
+
+def is_safe(record: List[int]) -> bool:
+    return is_safe_span(record, 0, len(record))
 
 
 def part1(records: List[List[int]]) -> int:
@@ -55,14 +74,7 @@ def part1(records: List[List[int]]) -> int:
 
 
 def can_make_safe(record: List[int]) -> bool:
-    for idx, item in enumerate(record):
-        # using list.remove causes issue here if there are duplicate item in
-        # the record, when trying to remove the second instance of the
-        # duplicate item, list.remove removes the first instance not the second
-        temp = record[:idx] + record[idx+1:]
-        if is_safe(temp):
-            return True
-    return False
+    return can_make_safe_span(record, 0, len(record))
 
 
 def part2(records: List[List[int]]) -> int:
@@ -76,9 +88,102 @@ def part2(records: List[List[int]]) -> int:
     return safe_count
 
 
+def count_safe(levels: Sequence[int], offsets: Sequence[int]) -> Tuple[int, int]:
+    # (safe reports, reports safe with the dampener) over flat reports
+    safe_count: int = 0
+    dampened_count: int = 0
+    for idx in range(len(offsets) - 1):
+        start, end = offsets[idx], offsets[idx + 1]
+        if is_safe_span(levels, start, end):
+            safe_count += 1
+            dampened_count += 1
+        elif can_make_safe_span(levels, start, end):
+            dampened_count += 1
+    return (safe_count, dampened_count)
+
+
+def pad_reports(levels: "np.ndarray", starts: "np.ndarray", lengths: "np.ndarray",
+                width: int) -> "np.ndarray":
+    # one report per row, cells past a report's length hold junk
+    columns = np.arange(width)
+    idx = np.minimum(starts[:, None] + columns[None, :], max(len(levels) - 1, 0))
+    return levels[idx]
+
+
+def safe_masks(reports: "np.ndarray", lengths: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    # (safe, safe with the dampener) for every row of a padded report matrix
+    rows, width = reports.shape
+    deltas = np.diff(reports, axis=1)
+    in_report = np.arange(width - 1)[None, :] < (lengths[:, None] - 1)
+    safe = np.zeros(rows, dtype=bool)
+    dampened = np.zeros(rows, dtype=bool)
+    for sign in (1, -1):
+        steps = deltas * sign
+        # steps past the end of a report count as fine
+        good = ((steps >= 1) & (steps <= 3)) | ~in_report
+        safe |= good.all(axis=1)
+        # before[:, k]: every step left of level k is fine,
+        # after[:, k]: every step right of level k is fine
+        ones = np.ones((rows, 1), dtype=bool)
+        before = np.logical_and.accumulate(np.hstack([ones, good]), axis=1)
+        after = np.logical_and.accumulate(
+            np.hstack([good, ones])[:, ::-1], axis=1)[:, ::-1]
+        for skip in range(width):
+            fixed = skip < lengths
+            if skip >= 1:
+                fixed &= before[:, skip - 1]
+            if skip + 1 < width:
+                fixed &= after[:, skip + 1]
+            if 1 <= skip < width - 1:
+                # the levels either side of the removed one become neighbours
+                bridge = (reports[:, skip + 1] - reports[:, skip - 1]) * sign
+                fixed &= ((bridge >= 1) & (bridge <= 3)) | (skip + 1 >= lengths)
+            dampened |= fixed
+    safe &= lengths >= 2
+    dampened = safe | (dampened & (lengths >= 3))
+    return (safe, dampened)
+
+
+def count_safe_numpy(levels: Sequence[int], offsets: Sequence[int],
+                     width: Optional[int] = None, block_rows: int = 1 << 20) -> Tuple[int, int]:
+    # same as count_safe, scoring blocks of reports at once as padded
+    # matrices; reports longer than width are scored one by one
+    # past 64 bits the levels come as a list of exact ints
+    if np is None or not isinstance(levels, array):
+        return count_safe(levels, offsets)
+    flat = np.asarray(levels, dtype=np.int64)
+    bounds = np.asarray(offsets, dtype=np.int64)
+    starts, lengths = bounds[:-1], np.diff(bounds)
+    if len(lengths) == 0:
+        return (0, 0)
+    if width is None:
+        width = max(2, int(np.percentile(lengths, 99)))
+    width = min(width, int(lengths.max()))
+    regular = lengths <= width
+    safe_count: int = 0
+    dampened_count: int = 0
+    for block in range(0, len(lengths), block_rows):
+        block_starts = starts[block:block + block_rows]
+        block_lengths = lengths[block:block + block_rows]
+        block_regular = regular[block:block + block_rows]
+        reports = pad_reports(flat, block_starts[block_regular], block_lengths[block_regular], width)
+        safe, dampened = safe_masks(reports, block_lengths[block_regular])
+        safe_count += int(np.count_nonzero(safe))
+        dampened_count += int(np.count_nonzero(dampened))
+    for idx in np.flatnonzero(~regular):
+        start, end = int(starts[idx]), int(starts[idx] + lengths[idx])
+        if is_safe_span(levels, start, end):
+            safe_count += 1
+            dampened_count += 1
+        elif can_make_safe_span(levels, start, end):
+            dampened_count += 1
+    return (safe_count, dampened_count)
+
+
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day02.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day02.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day02.input")
+    test_file: str = os.path.join(root, "tests", "day02.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     records: List[List[int]]
@@ -88,9 +193,13 @@ if __name__ == "__main__":
         p2_result = part2(records)
         assert p1_result == 606
         assert p2_result == 644
+        assert count_safe(*read_flat(input_file)) == (p1_result, p2_result)
+        assert count_safe_numpy(*read_flat(input_file)) == (p1_result, p2_result)
     elif mode.strip().lower() == "test":
         records = read_data(test_file)
         p1_result = part1(records)
         p2_result = part2(records)
         assert p1_result == 2
         assert p2_result == 4
+        assert count_safe(*read_flat(test_file)) == (p1_result, p2_result)
+        assert count_safe_numpy(*read_flat(test_file)) == (p1_result, p2_result)
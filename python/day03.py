@@ -1,6 +1,15 @@
 import os
 import re
 import sys
+import mmap
+from typing import BinaryIO, Iterable, Iterator, Tuple
+
+
+TOKEN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+# a match starting this many bytes before the end of the buffer could still
+# grow or turn into a different token once more input arrives
+LONGEST_TOKEN: int = len(b"mul(123,456)")
+CHUNK_SIZE: int = 1 << 20
 
 
 def read_data(file_name: str) -> str:
@@ -10,34 +19,87 @@ def read_data(file_name: str) -> str:
     return data
 
 
+def scan(chunks: Iterable[bytes]) -> Tuple[int, int]:
+    # single pass over the corrupted memory: (sum of every mul, sum of the
+    # muls enabled by do()/don't())
+    total: int = 0
+    enabled_total: int = 0
+    enabled: bool = True
+    buffer: bytes = b""
+    for chunk, final in with_last(chunks):
+        buffer += chunk
+        settled = len(buffer) if final else len(buffer) - (LONGEST_TOKEN - 1)
+        end: int = 0
+        for match in TOKEN.finditer(buffer):
+            if match.start() >= settled:
+                break
+            end = match.end()
+            token = match.group(0)
+            if token == b"do()":
+                enabled = True
+            elif token == b"don't()":
+                enabled = False
+            else:
+                product = int(match.group(1)) * int(match.group(2))
+                total += product
+                if enabled:
+                    enabled_total += product
+        buffer = buffer[max(end, settled, 0):]
+    return (total, enabled_total)
+
+
+def with_last(chunks: Iterable[bytes]) -> Iterator[Tuple[bytes, bool]]:
+    # pairs each chunk with whether it is the last one, always ending with
+    # a final (possibly empty) chunk
+    previous = None
+    for chunk in chunks:
+        if previous is not None:
+            yield (previous, False)
+        previous = chunk
+    yield (previous or b"", True)
+
+
+def read_chunks(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def mapped_chunks(data: mmap.mmap, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def scan_file(file_name: str, use_mmap: bool = False) -> Tuple[int, int]:
+    # "-" reads from stdin
+    if file_name == "-":
+        return scan(read_chunks(sys.stdin.buffer))
+    with open(file_name, "rb") as file:
+        if use_mmap and os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return scan(mapped_chunks(data))
+        return scan(read_chunks(file))
+
+
 def part1(data: str) -> int:
-    matches = re.findall("mul\\((\\d{1,3}),\\.*(\\d{1,3})\\)", data)
-    res: int = 0
-    for match in matches:
-        res += int(match[0]) * int(match[1])
-    return res
+    return scan([data.encode()])[0]
 
 
 def part2(data: str) -> int:
-    newdata = re.sub(r"don't\(\).*?(do\(\))", r'', data, flags=re.DOTALL)
-    matches = re.findall("mul\\((\\d{1,3}),\\.*?(\\d{1,3})\\)", newdata)
-    res: int = 0
-    for match in matches:
-        res += int(match[0]) * int(match[1])
-    return res
+    return scan([data.encode()])[1]
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day03.input"
-    test_file1: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day03.test1"
-    test_file2: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day03.test2"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day03.input")
+    test_file1: str = os.path.join(root, "tests", "day03.test1")
+    test_file2: str = os.path.join(root, "tests", "day03.test2")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
-    data: str
     if mode.strip().lower() == "input":
-        data = read_data(input_file)
-        p1_result = part1(data)
-        p2_result = part2(data)
+        p1_result, p2_result = scan_file(input_file, use_mmap=True)
         assert p1_result == 173731097
         assert p2_result == 93729253
     elif mode.strip().lower() == "test":
@@ -47,5 +109,7 @@ if __name__ == "__main__":
         p2_result = part2(test_data2)
         assert p1_result == 161
         assert p2_result == 48
+    elif mode.strip().lower() == "-":
+        print(*scan_file("-"))
     else:
-        print(f"Usage: {os.sys.argv[0]} [test|input]", file=sys.stderr)
+        print(f"Usage: {os.sys.argv[0]} [test|input|-]", file=sys.stderr)
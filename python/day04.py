@@ -1,131 +1,241 @@
-from typing import List
+from typing import Deque, Dict, Iterator, List, Tuple
+from collections import deque
 import os
 import sys
 
+from grid import Grid
 
-def read_data(file_name: str) -> List[str]:
-    lines: List[str] = None
-    with open(file_name, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
-    return lines
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
-def part1(input: List[str]) -> int:
+def read_data(file_name: str) -> Grid:
+    return Grid.map_file(file_name)
+
+
+DIRECTIONS: List[Tuple[int, int]] = [
+    (0, 1), (0, -1), (-1, 0), (1, 0), (-1, 1), (-1, -1), (1, -1), (1, 1),
+]
+
+
+def start_range(step: int, length: int, word_len: int) -> Tuple[int, int]:
+    # starting indices for which every letter of the word stays on the grid
+    if step > 0:
+        return (0, length - (word_len - 1))
+    if step < 0:
+        return (word_len - 1, length)
+    return (0, length)
+
+
+def shifted(grid: "np.ndarray", y_range: Tuple[int, int], x_range: Tuple[int, int],
+            dy: int, dx: int) -> "np.ndarray":
+    # view of the grid with every start cell moved by (dy, dx)
+    return grid[y_range[0] + dy:y_range[1] + dy, x_range[0] + dx:x_range[1] + dx]
+
+
+def count_word_numpy(grid: "np.ndarray", word: str) -> int:
+    height, width = grid.shape
+    letters = word.encode()
     count: int = 0
-    diff: int = 0
-    for y, line in enumerate(input):
-        for x, char in enumerate(line):
-            if (char == 'X'):
-                match: str = "XMAS"
-                reverse: str = "SAMX"
-
-                # check right
-                if x + (len(match) - 1) < len(line) and line[x:x + len(match)] == match:
-                    count += 1
-
-                # check left
-                if x >= (len(reverse) - 1) and line[x - (len(reverse) - 1):x + 1] == reverse:
-                    count += 1
-
-                diff = 0
-                # check top
-                while y >= (len(match) - 1) and diff < len(match):
-                    if (input[y - diff][x] != match[diff]):
-                        break
-                    diff += 1
-                    if (diff == 4):
-                        count += 1
-                        break
-
-                diff = 0
-                # check bottom
-                while (y + (len(match) - 1) < len(input) and diff < len(match)):
-                    if input[y + diff][x] != match[diff]:
-                        break
-                    diff += 1
-                    if (diff == 4):
-                        count += 1
-                        break
-
-                diff = 0
-                # check top right
-                while y >= (len(match) - 1) and x + (len(match) - 1) < len(line) and diff < len(match):
-                    if input[y - diff][x + diff] != match[diff]:
-                        break
-                    diff += 1
-                    if diff == 4:
-                        count += 1
-                        break
-
-                diff = 0
-                # check top left
-                while y >= (len(match) - 1) and x >= (len(match) - 1) and diff < len(match):
-                    if input[y - diff][x - diff] != match[diff]:
-                        break
-                    diff += 1
-                    if diff == 4:
-                        count += 1
-                        break
-
-                diff = 0
-                # check bottom left
-                while (y + (len(match) - 1) < len(input) and x >= (len(match) - 1) and diff < len(match)):
-                    if input[y + diff][x - diff] != match[diff]:
-                        break
-                    diff += 1
-                    if diff == 4:
-                        count += 1
-                        break
-
-                diff = 0
-                # check bottom right
-                while y + (len(match) - 1) < len(input) and x + (len(match) - 1) < len(line) and diff < len(match):
-                    if input[y + diff][x + diff] != match[diff]:
-                        break
-                    diff += 1
-                    if diff == 4:
-                        count += 1
-                        break
+    for dy, dx in DIRECTIONS:
+        y_range = start_range(dy, height, len(word))
+        x_range = start_range(dx, width, len(word))
+        if y_range[0] >= y_range[1] or x_range[0] >= x_range[1]:
+            continue
+        found = shifted(grid, y_range, x_range, 0, 0) == letters[0]
+        for idx in range(1, len(letters)):
+            found &= shifted(grid, y_range, x_range, idx * dy, idx * dx) == letters[idx]
+        count += int(np.count_nonzero(found))
     return count
 
 
-def part2(input: List[str]) -> int:
+def count_word_python(grid: Grid, word: str) -> int:
+    # with a border as wide as the word no step can leave the buffer
+    grid = grid.padded(len(word) - 1)
+    cells = grid.cells
+    letters = word.encode()
     count: int = 0
-    patterns: List[List[int]] = [
-        # M:x, y}, S:x, y}
-        [-1, -1, 1, 1],  # top_left-to-bottom_right
-        [-1, 1, 1, -1],  # bottom_left-to-top_right
-        [1, -1, -1, 1],  # top_right-to-bottom_left
-        [1, 1, -1, -1],  # bottom_right-to-top_left
-    ]
-    for y, line in enumerate(input):
-        for x, char in enumerate(line):
-            if (char == 'A' and y > 0 and x > 0 and y < (len(input) - 1) and x < (len(line) - 1)):
-                tempCount: int = 0
-                for item in patterns:
-                    if (input[y + item[1]][x + item[0]] == 'M' and input[y + item[3]][x + item[2]] == 'S'):
-                        tempCount += 1
-                if (tempCount == 2):
-                    count += 1
+    idx = grid.find(letters[:1])
+    while idx != -1:
+        for offset in grid.offsets:
+            if all(cells[idx + step * offset] == letters[step]
+                   for step in range(1, len(letters))):
+                count += 1
+        idx = cells.find(letters[:1], idx + 1)
     return count
 
 
+def part1(grid: Grid, word: str = "XMAS") -> int:
+    if np is not None:
+        return count_word_numpy(grid.array(), word)
+    return count_word_python(grid, word)
+
+
+def count_crosses_numpy(grid: "np.ndarray", word: str) -> int:
+    # both diagonals through a centre cell have to read word either way
+    height, width = grid.shape
+    reach = len(word) // 2
+    if height <= 2 * reach or width <= 2 * reach:
+        return 0
+    y_range = (reach, height - reach)
+    x_range = (reach, width - reach)
+    letters = word.encode()
+    crosses = None
+    for diagonal in ((1, 1), (1, -1)):
+        forward = np.ones((y_range[1] - y_range[0], x_range[1] - x_range[0]), dtype=bool)
+        backward = forward.copy()
+        for idx, letter in enumerate(letters):
+            offset = idx - reach
+            view = shifted(grid, y_range, x_range, offset * diagonal[0], offset * diagonal[1])
+            forward &= view == letter
+            backward &= view == letters[-1 - idx]
+        matched = forward | backward
+        crosses = matched if crosses is None else crosses & matched
+    return int(np.count_nonzero(crosses))
+
+
+def count_crosses_python(grid: Grid, word: str) -> int:
+    reach = len(word) // 2
+    grid = grid.padded(max(reach, 1))
+    cells = grid.cells
+    letters = word.encode()
+    matches = (letters, letters[::-1])
+    down_right, down_left = grid.offsets[5], grid.offsets[6]
+    count: int = 0
+    idx = grid.find(letters[reach:reach + 1])
+    while idx != -1:
+        if cells[idx - reach * down_right:idx + reach * down_right + 1:down_right] in matches \
+                and cells[idx - reach * down_left:idx + reach * down_left + 1:down_left] in matches:
+            count += 1
+        idx = cells.find(letters[reach:reach + 1], idx + 1)
+    return count
+
+
+def part2(grid: Grid, word: str = "MAS") -> int:
+    # the crossing diagonals share the middle letter, which an even length
+    # word does not have
+    if len(word) % 2 == 0:
+        raise ValueError(f"a cross needs an odd length word, not {word!r}")
+    if np is not None:
+        return count_crosses_numpy(grid.array(), word)
+    return count_crosses_python(grid, word)
+
+
+class WordAutomaton:
+    # Aho-Corasick automaton: goto transitions, failure links and, per
+    # state, the indices of the words that end there
+    words: List[str]
+    goto: List[Dict[str, int]]
+    fail: List[int]
+    output: List[List[int]]
+
+    def __init__(self, words: List[str]):
+        self.words = list(dict.fromkeys(word for word in words if len(word) != 0))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for idx, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(idx)
+
+        queue: Deque[int] = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0) if state else 0
+                self.output[next_state] = self.output[next_state] + \
+                    self.output[self.fail[next_state]]
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int]]:
+        # (index of the last char, word index) for every match in text
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for idx in output[state]:
+                yield (end, idx)
+
+
+def grid_lines(grid: Grid) -> Iterator[Tuple[int, int, int, int, int]]:
+    # (start y, start x, dy, dx, length) of every row, column and diagonal
+    height, width = grid.height, grid.width
+    for y in range(height):
+        yield (y, 0, 0, 1, width)
+    for x in range(width):
+        yield (0, x, 1, 0, height)
+    for y in range(height):
+        yield (y, 0, 1, 1, min(height - y, width))
+    for x in range(1, width):
+        yield (0, x, 1, 1, min(height, width - x))
+    for x in range(width):
+        yield (0, x, 1, -1, min(height, x + 1))
+    for y in range(1, height):
+        yield (y, width - 1, 1, -1, min(height - y, width))
+
+
+def word_matches(grid: Grid, words: List[str]) -> Iterator[Tuple[str, int, int, int, int]]:
+    # (word, start y, start x, dy, dx) of every occurrence of any of the
+    # words in any of the 8 directions, scanning each line once per way
+    automaton = WordAutomaton(words)
+    for start_y, start_x, dy, dx, length in grid_lines(grid):
+        line = grid.line(start_y, start_x, dy, dx, length).decode()
+        for end, word_idx in automaton.scan(line):
+            word = automaton.words[word_idx]
+            start = end - len(word) + 1
+            yield (word, start_y + start * dy, start_x + start * dx, dy, dx)
+        for end, word_idx in automaton.scan(line[::-1]):
+            word = automaton.words[word_idx]
+            start = length - 1 - (end - len(word) + 1)
+            yield (word, start_y + start * dy, start_x + start * dx, -dy, -dx)
+
+
+def count_words(grid: Grid, words: List[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {word: 0 for word in words}
+    for word, *_ in word_matches(grid, words):
+        counts[word] += 1
+    return counts
+
+
+def find_words(grid: Grid, words: List[str]) -> Dict[str, List[Tuple[int, int, int, int]]]:
+    # (start y, start x, dy, dx) of every occurrence, per word
+    found: Dict[str, List[Tuple[int, int, int, int]]] = {word: [] for word in words}
+    for word, y, x, dy, dx in word_matches(grid, words):
+        found[word].append((y, x, dy, dx))
+    return found
+
+
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day04.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day04.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day04.input")
+    test_file: str = os.path.join(root, "tests", "day04.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
-    records: List[List[int]]
+    grid: Grid
     if mode.strip().lower() == "input":
-        records = read_data(input_file)
-        p1_result = part1(records)
-        p2_result = part2(records)
+        grid = read_data(input_file)
+        p1_result = part1(grid)
+        p2_result = part2(grid)
         assert p1_result == 2496
         assert p2_result == 1967
     elif mode.strip().lower() == "test":
-        records = read_data(test_file)
-        p1_result = part1(records)
-        p2_result = part2(records)
+        grid = read_data(test_file)
+        p1_result = part1(grid)
+        p2_result = part2(grid)
         assert p1_result == 18
         assert p2_result == 9
     else:
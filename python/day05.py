@@ -1,77 +1,200 @@
 import os
+import re
 import sys
-from typing import List, DefaultDict, Tuple
+from typing import (DefaultDict, Dict, Iterable, Iterator, List, Optional,
+                    TextIO, Tuple)
+from array import array
 from collections import defaultdict
+from functools import partial
 
+from ints import parse_int_rows, parse_ints, read_bytes
+from parallel import map_chunks
+from sidecar import cached_arrays
 
-def read_data(file_name: str) -> Tuple[DefaultDict[int, List[int]], List[List[int]]]:
-    lines: List[str]
+
+def read_rules(file: TextIO) -> DefaultDict[int, List[int]]:
+    # rules run up to the first blank line
     rules: DefaultDict[int, List[int]] = defaultdict(list)
-    updates: List[[List[int]]] = []
-    with open(file_name, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
+    for line in file:
+        if len(line.strip()) == 0:
+            break
+        key, value = [int(num.strip()) for num in line.strip().split("|")]
+        rules[value].append(key)
+    return rules
+
 
-    areRules: bool = True
-    for line in lines:
+def read_updates(file: TextIO) -> Iterator[List[int]]:
+    for line in file:
         if len(line.strip()) == 0:
-            areRules = False
             continue
-        if areRules:
-            key, value = [int(num.strip()) for num in line.strip().split("|")]
-            rules[value].append(key)
-        else:
-            updates.append([int(num.strip())
-                           for num in line.strip().split(",")])
+        yield [int(num.strip()) for num in line.strip().split(",")]
+
+
+def parse_sections(file_name: str) -> List[array]:
+    # rules and updates are separated by the first blank line; the rules
+    # become one flat array of pairs, the updates pages and offsets
+    sections = re.split(rb"\r?\n[ \t]*\r?\n", read_bytes(file_name), maxsplit=1)
+    rules_text = sections[0]
+    updates_text = sections[1] if len(sections) > 1 else b""
+    return [parse_ints(rules_text, b"|"), *parse_int_rows(updates_text, b",")]
+
 
+def read_data(file_name: str) -> Tuple[DefaultDict[int, List[int]], List[List[int]]]:
+    pairs, pages, offsets = cached_arrays(file_name, "day05",
+                                          lambda: parse_sections(file_name))
+    rules: DefaultDict[int, List[int]] = defaultdict(list)
+    for idx in range(0, len(pairs), 2):
+        rules[pairs[idx + 1]].append(pairs[idx])
+    updates: List[List[int]] = [list(pages[offsets[idx]:offsets[idx + 1]])
+                                for idx in range(len(offsets) - 1)]
     return (rules, updates)
 
 
-def is_valid_update(update: List[int], rules: DefaultDict[int, List[int]]) -> bool:
-    for idx, page in enumerate(update):
-        for item in rules[page]:
-            if item in update[idx:]:
-                return False
+class RuleIndex:
+    # bit assigned to every page that shows up in a rule
+    bits: Dict[int, int]
+    # mask of the pages that have to be printed before each page
+    before: Dict[int, int]
+
+    def __init__(self, rules: DefaultDict[int, List[int]]):
+        self.bits = {}
+        self.before = {}
+        for page, earlier_pages in rules.items():
+            mask: int = 0
+            for earlier in earlier_pages:
+                mask |= 1 << self.bit(earlier)
+            self.bit(page)
+            self.before[page] = mask
+
+    def bit(self, page: int) -> int:
+        if page not in self.bits:
+            self.bits[page] = len(self.bits)
+        return self.bits[page]
+
+    def mask(self, update: List[int]) -> int:
+        mask: int = 0
+        for page in update:
+            if page in self.bits:
+                mask |= 1 << self.bits[page]
+        return mask
+
+
+def is_valid_update(update: List[int], index: RuleIndex) -> bool:
+    # walking backwards, no page may need one of the pages already passed
+    later: int = 0
+    for page in reversed(update):
+        if index.before.get(page, 0) & later:
+            return False
+        if page in index.bits:
+            later |= 1 << index.bits[page]
     return True
 
 
 def part1(updates: List[List[int]], rules: DefaultDict[int, List[int]]) -> int:
+    index: RuleIndex = RuleIndex(rules)
     middle_total: int = 0
     for update in updates:
-        isValid: bool = is_valid_update(update, rules)
+        isValid: bool = is_valid_update(update, index)
         if isValid:
             middle_total += update[len(update)//2]
     return middle_total
 
 
-def fix_update(update: List[int], rules: DefaultDict[int, List[int]]) -> List[int]:
-    i = 0
-    j = 0
-    while i < len(update):
-        j = i + 1
-        while j < len(update):
-            if update[j] in rules[update[i]]:
-                temp = update[i]
-                update[i] = update[j]
-                update[j] = temp
-            else:
-                j += 1
-        i += 1
+def fix_update(update: List[int], index: RuleIndex) -> List[int]:
+    # local topological sort: repeatedly take the first page that no longer
+    # waits on any of the pages still left to place
+    pending: List[int] = update.copy()
+    remaining: int = index.mask(update)
+    update.clear()
+    while pending:
+        ready: int = 0
+        for idx, page in enumerate(pending):
+            if not index.before.get(page, 0) & remaining:
+                ready = idx
+                break
+        page = pending.pop(ready)
+        update.append(page)
+        if page in index.bits:
+            remaining &= ~(1 << index.bits[page])
     return update
 
 
+def fixed_middle_page(update: List[int], index: RuleIndex) -> int:
+    # in the fixed order the middle page has exactly half of the other pages
+    # before it, which can be read off the rules without sorting
+    present: int = index.mask(update)
+    middle: int = len(update) // 2
+    counts: List[int] = [(index.before.get(page, 0) & present).bit_count()
+                         for page in update]
+    # counts are all below len(update), so distinct counts mean a total order
+    if len(set(counts)) == len(update):
+        return update[counts.index(middle)]
+    # the rules do not order every pair of pages in this update
+    res = fix_update(update.copy(), index)
+    return res[middle]
+
+
 def part2(updates: List[List[int]], rules: DefaultDict[int, List[int]]) -> int:
+    index: RuleIndex = RuleIndex(rules)
     middle_total: int = 0
     for update in updates:
-        isValid: bool = is_valid_update(update, rules)
+        isValid: bool = is_valid_update(update, index)
         if not isValid:
-            res = fix_update(update.copy(), rules)
-            middle_total += res[len(res)//2]
+            middle_total += fixed_middle_page(update, index)
     return middle_total
 
 
+def middle_totals(updates: Iterable[List[int]], index: RuleIndex) -> Tuple[int, int]:
+    # (middle total of the valid updates, middle total of the fixed ones)
+    valid_total: int = 0
+    fixed_total: int = 0
+    for update in updates:
+        if is_valid_update(update, index):
+            valid_total += update[len(update)//2]
+        else:
+            fixed_total += fixed_middle_page(update, index)
+    return (valid_total, fixed_total)
+
+
+worker_index: Optional[RuleIndex] = None
+
+
+def init_worker(index: RuleIndex) -> None:
+    global worker_index
+    worker_index = index
+
+
+def middle_totals_worker(updates: List[List[int]]) -> Tuple[int, int]:
+    return middle_totals(updates, worker_index)
+
+
+def batch_middle_totals(updates: Iterable[List[int]], rules: DefaultDict[int, List[int]],
+                        workers: Optional[int] = None,
+                        chunk_size: int = 8192) -> Tuple[int, int]:
+    # part1 and part2 answers from a single pass over the updates, with the
+    # rule index sent to each worker once and the updates sent in chunks
+    index: RuleIndex = RuleIndex(rules)
+    valid_total: int = 0
+    fixed_total: int = 0
+    for valid, fixed in map_chunks(middle_totals_worker, updates, chunk_size, workers,
+                                   init_worker, (index,),
+                                   local=partial(middle_totals, index=index)):
+        valid_total += valid
+        fixed_total += fixed
+    return (valid_total, fixed_total)
+
+
+def batch_file(file_name: str, workers: Optional[int] = None) -> Tuple[int, int]:
+    # reads the updates as they are validated instead of loading them first
+    with open(file_name, "r") as file:
+        rules = read_rules(file)
+        return batch_middle_totals(read_updates(file), rules, workers)
+
+
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day05.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day05.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day05.input")
+    test_file: str = os.path.join(root, "tests", "day05.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     updates: List[List[int]]
@@ -82,11 +205,13 @@ if __name__ == "__main__":
         p2_result = part2(update, rules)
         assert p1_result == 5166
         assert p2_result == 4679
+        assert batch_file(input_file) == (p1_result, p2_result)
     elif mode.strip().lower() == "test":
         rules, update = read_data(test_file)
         p1_result = part1(update, rules)
         p2_result = part2(update, rules)
         assert p1_result == 143
         assert p2_result == 123
+        assert batch_file(test_file) == (p1_result, p2_result)
     else:
         print(f"Usage: {os.sys.argv[0]} [test|input]", file=sys.stderr)
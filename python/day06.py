@@ -1,170 +1,397 @@
 import os
 import sys
 
-from typing import List, Tuple, DefaultDict
-from collections import defaultdict
-import copy
-
-
-def read_data(file_name: str) -> List[List[str]]:
-    lines: List[List[str]]
-    with open(file_name, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
-
-    data: List[List[str]] = []
-    for line in lines:
-        row: List[str] = []
-        for char in line.strip():
-            row.append(char)
-        data.append(row)
-    return data
-
-
-def get_start(mapped_area: List[List[str]]) -> Tuple[int, Tuple[int, int]]:
-    dm_idx: int = -1
-    start_x, start_y = -1, -1
-    for y, row in enumerate(mapped_area):
-        for x, col in enumerate(row):
-            if col == '.' or col == '#':
-                continue
-            start_x = x
-            start_y = y
-            if col == '^':
-                dm_idx = 0
-                break
-            if col == '>':
-                dm_idx = 1
-                break
-            if col == 'v':
-                dm_idx = 2
+from typing import Dict, List, Optional, Tuple
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from grid import Grid
+from parallel import map_chunks
+
+
+def read_data(file_name: str) -> Grid:
+    return Grid.map_file(file_name)
+
+
+def get_start(grid: Grid) -> Tuple[int, int]:
+    # (direction, cell) of the guard
+    for dm_idx, char in enumerate(b"^>v<"):
+        idx = grid.find(bytes([char]))
+        if idx != -1:
+            return (dm_idx, idx)
+    return (-1, -1)
+
+
+OBSTACLE: int = ord("#")
+
+
+class Lab:
+    width: int
+    height: int
+    # cells are indexed like the grid they come from
+    stride: int
+    origin: int
+    size: int
+    start: int
+    direction: int
+    # flat step for each direction: up, right, down, left
+    steps: Tuple[int, int, int, int]
+    # stops[direction * size + cell] is the last cell the guard reaches when
+    # walking from cell in direction, exits[...] is 1 if it walks off the map
+    stops: array
+    exits: bytearray
+
+    def __init__(self, grid: Grid):
+        self.height = grid.height
+        self.width = grid.width
+        self.stride = grid.stride
+        self.origin = grid.origin
+        self.size = len(grid.cells)
+        self.direction, self.start = get_start(grid)
+        self.steps = grid.offsets[:4]
+        self.build_jump_table(grid.cells)
+
+    def build_jump_table(self, cells: bytes) -> None:
+        width, height, stride, size = self.width, self.height, self.stride, self.size
+        self.stops = array('l', [0]) * (4 * size)
+        self.exits = bytearray(4 * size)
+        top = self.origin
+        bottom = top + (height - 1) * stride
+        # each line is swept starting from the end the guard walks towards
+        self.sweep(cells, 0, [range(top + x, bottom + x + 1, stride)
+                              for x in range(width)])
+        self.sweep(cells, 1, [range(top + y * stride + width - 1, top + y * stride - 1, -1)
+                              for y in range(height)])
+        self.sweep(cells, 2, [range(bottom + x, top + x - 1, -stride)
+                              for x in range(width)])
+        self.sweep(cells, 3, [range(top + y * stride, top + y * stride + width)
+                              for y in range(height)])
+
+    def sweep(self, cells: bytes, dm_idx: int, lines: List[range]) -> None:
+        base = dm_idx * self.size
+        stops, exits = self.stops, self.exits
+        for line in lines:
+            last: int = -1
+            leaves: bool = True
+            for idx in line:
+                if cells[idx] == OBSTACLE:
+                    last = -1
+                    leaves = False
+                    continue
+                if last == -1:
+                    last = idx
+                stops[base + idx] = last
+                exits[base + idx] = leaves
+
+    def patrol(self) -> List[Tuple[int, int, int]]:
+        # every cell the guard visits, in order, with the cell and direction
+        # the guard had right before stepping onto it for the first time
+        size = self.size
+        visited = bytearray(size)
+        turns = bytearray(4 * size)
+        visited[self.start] = 1
+        path: List[Tuple[int, int, int]] = []
+        pos, dm_idx = self.start, self.direction
+        while True:
+            step = self.steps[dm_idx]
+            stop = self.stops[dm_idx * size + pos]
+            while pos != stop:
+                pos += step
+                if not visited[pos]:
+                    visited[pos] = 1
+                    path.append((pos, pos - step, dm_idx))
+            if self.exits[dm_idx * size + stop] or turns[dm_idx * size + stop]:
+                return path
+            turns[dm_idx * size + stop] = 1
+            dm_idx = (dm_idx + 1) % 4
+
+    def has_loop(self, obstacle: int, pos: int, dm_idx: int, seen: bytearray) -> bool:
+        # walk turn to turn with an extra obstacle, checking whether that
+        # obstacle cuts the precomputed jump short
+        size, stride = self.size, self.stride
+        stops, exits = self.stops, self.exits
+        obstacle_y, obstacle_x = divmod(obstacle, stride)
+        touched: List[int] = []
+        looped: bool = False
+        while True:
+            state = dm_idx * size + pos
+            stop = stops[state]
+            if dm_idx == 0:
+                cut = obstacle_x == pos % stride and stop <= obstacle < pos
+            elif dm_idx == 1:
+                cut = obstacle_y == pos // stride and pos < obstacle <= stop
+            elif dm_idx == 2:
+                cut = obstacle_x == pos % stride and pos < obstacle <= stop
+            else:
+                cut = obstacle_y == pos // stride and stop <= obstacle < pos
+            if cut:
+                stop = obstacle - self.steps[dm_idx]
+            elif exits[state]:
                 break
-            if col == '<':
-                dm_idx = 3
+            state = dm_idx * size + stop
+            if seen[state]:
+                looped = True
                 break
-        if start_x > 0 and start_y > 0:
-            break
-    return (dm_idx, (start_x, start_y))
-
-
-def part1(mapped_area: List[List[str]]) -> int:
-    direction_mapping = [
-        [0, -1],  # top (x, y)
-        [1, 0],  # right (x, y)
-        [0, 1],  # bottom (x, y)
-        [-1, 0],  # left (x, y)
-    ]
-    dm_idx, (x, y) = get_start(mapped_area)
-    assert x == 4 or x == 65
-    assert y == 6 or y == 37
-    assert dm_idx == 0
-    next_x: int = x + direction_mapping[dm_idx][0]
-    next_y: int = y + direction_mapping[dm_idx][1]
-    visited_position = defaultdict(default_factory=lambda: -1)
-    while -1 < next_x < len(mapped_area[0]) and -1 < next_y < len(mapped_area):
-        # check if next is a obstacle
-        if mapped_area[next_y][next_x] == '#':
-            dm_idx = (dm_idx + 1) % len(direction_mapping)
-        x += direction_mapping[dm_idx][0]
-        y += direction_mapping[dm_idx][1]
-        visited_position[(y, x)] = dm_idx
-        next_y = y + direction_mapping[dm_idx][1]
-        next_x = x + direction_mapping[dm_idx][0]
-    return len(visited_position.keys())-1  # empty defaultdict has len 1
-
-
-def get_visited_cells(mapped_area: List[List[str]]) -> DefaultDict[Tuple[int, int], int]:
-    direction_mapping = [
-        [0, -1],  # top (x, y)
-        [1, 0],  # right (x, y)
-        [0, 1],  # bottom (x, y)
-        [-1, 0],  # left (x, y)
-    ]
-    dm_idx, (x, y) = get_start(mapped_area)
-    assert x == 4 or x == 65
-    assert y == 6 or y == 37
-    assert dm_idx == 0
-    next_x: int = x + direction_mapping[dm_idx][0]
-    next_y: int = y + direction_mapping[dm_idx][1]
-    visited_position: DefaultDict[Tuple[int, int],
-                                  int] = defaultdict(default_factory=lambda: -1)
-    while -1 < next_x < len(mapped_area[0]) and -1 < next_y < len(mapped_area):
-        # check if next is a obstacle
-        if mapped_area[next_y][next_x] == '#':
-            dm_idx = (dm_idx + 1) % len(direction_mapping)
-        x += direction_mapping[dm_idx][0]
-        y += direction_mapping[dm_idx][1]
-        visited_position[(y, x)] = dm_idx
-        next_y = y + direction_mapping[dm_idx][1]
-        next_x = x + direction_mapping[dm_idx][0]
-    return visited_position
-
-
-def has_loop(mapped_area: List[List[str]]) -> bool:
-    direction_mapping = [
-        [0, -1],  # top (x, y)
-        [1, 0],  # right (x, y)
-        [0, 1],  # bottom (x, y)
-        [-1, 0],  # left (x, y)
-    ]
-    dm_idx, (x, y) = get_start(mapped_area)
-    visited_position = defaultdict(lambda: -1)
-    next_x: int = x + direction_mapping[dm_idx][0]
-    next_y: int = y + direction_mapping[dm_idx][1]
-    while -1 < next_x < len(mapped_area[0]) and -1 < next_y < len(mapped_area):
-        if visited_position[(y, x)] == dm_idx:
-            return True
-        # check if next is a obstacle
-        if mapped_area[next_y][next_x] == '#':
-            dm_idx = (dm_idx + 1) % len(direction_mapping)
-            next_y = y + direction_mapping[dm_idx][1]
-            next_x = x + direction_mapping[dm_idx][0]
-            continue
-        visited_position[(y, x)] = dm_idx
-        x += direction_mapping[dm_idx][0]
-        y += direction_mapping[dm_idx][1]
-        next_y = y + direction_mapping[dm_idx][1]
-        next_x = x + direction_mapping[dm_idx][0]
-    return False
-
-
-def part2(mapped_area: List[List[str]]) -> int:
-    count: int = 0
-    visited_cells: DefaultDict[Tuple[int, int],
-                               int] = get_visited_cells(mapped_area)
-    (dm_idx, (start_x, start_y)) = get_start(mapped_area)
-    for item in visited_cells.keys():
-        try:
-            y, x = item
-            if x == start_x and y == start_y:
-                continue
-            if not (0 <= y < len(mapped_area)) and not (0 <= x < len(mapped_area[0])):
-                continue
-            if mapped_area[y][x] == '.':
-                copy_map = copy.deepcopy(mapped_area)
-                copy_map[y][x] = '#'
-                if has_loop(copy_map):
-                    count += 1
-        except Exception:
-            continue
-    return count
+            seen[state] = 1
+            touched.append(state)
+            pos = stop
+            dm_idx = (dm_idx + 1) % 4
+        for state in touched:
+            seen[state] = 0
+        return looped
+
+    def count_loops(self, candidates: List[Tuple[int, int, int]]) -> int:
+        seen = bytearray(4 * self.size)
+        count: int = 0
+        for obstacle, pos, dm_idx in candidates:
+            if self.has_loop(obstacle, pos, dm_idx, seen):
+                count += 1
+        return count
+
+
+worker_lab: Optional[Lab] = None
+
+
+def init_worker(lab: Lab) -> None:
+    global worker_lab
+    worker_lab = lab
+
+
+def count_loops_worker(candidates: List[Tuple[int, int, int]]) -> int:
+    return worker_lab.count_loops(candidates)
+
+
+# byte translation tables stepping a visit count up or down by one
+INCREMENT: bytes = bytes(range(1, 256)) + b"\x00"
+DECREMENT: bytes = b"\xff" + bytes(range(255))
+
+
+class GuardModel:
+    # the guard's path as segments between turns, kept up to date while
+    # obstacles are added and removed: an edit only re-walks the path from
+    # the first segment it changes, and every segment is found by bisecting
+    # the obstacles of its row or column instead of stepping through cells
+    width: int
+    height: int
+    start: int
+    direction: int
+    # sorted obstacle columns of every row and rows of every column
+    row_obstacles: List[List[int]]
+    col_obstacles: List[List[int]]
+    # segment idx walks from seg_starts[idx] in seg_dirs[idx] to
+    # seg_stops[idx], cells numbered y * width + x
+    seg_starts: array
+    seg_dirs: bytearray
+    seg_stops: array
+    # segments running along each row and each column, in path order
+    row_segments: Dict[int, List[int]]
+    col_segments: Dict[int, List[int]]
+    # first segment each obstacle stopped
+    blockers: Dict[int, int]
+    # segment ending at each (direction, stop) turn
+    turns: Dict[int, int]
+    looped: bool
+    # number of segments covering each cell, and how many cells have any;
+    # a cell is crossed at most once per direction and turned on at most
+    # once more, so the counts stay far below 256
+    visits: bytearray
+    visited: int
+
+    def __init__(self, grid: Grid):
+        self.width = grid.width
+        self.height = grid.height
+        self.direction, start = get_start(grid)
+        start_y, start_x = grid.position(start)
+        self.start = start_y * self.width + start_x
+        self.row_obstacles = [[] for _ in range(self.height)]
+        self.col_obstacles = [[] for _ in range(self.width)]
+        for y in range(self.height):
+            for x, cell in enumerate(grid.row(y)):
+                if cell == OBSTACLE:
+                    self.row_obstacles[y].append(x)
+                    self.col_obstacles[x].append(y)
+        self.seg_starts = array('l')
+        self.seg_dirs = bytearray()
+        self.seg_stops = array('l')
+        self.row_segments = {}
+        self.col_segments = {}
+        self.blockers = {}
+        self.turns = {}
+        self.visits = bytearray(self.width * self.height)
+        self.visited = 0
+        self.walk(0)
+
+    def path_length(self) -> int:
+        # distinct cells the guard visits
+        return self.visited
+
+    def loops(self) -> bool:
+        return self.looped
+
+    def add_obstacle(self, y: int, x: int) -> None:
+        if not (0 <= y < self.height and 0 <= x < self.width) or \
+                y * self.width + x == self.start:
+            raise ValueError(f"cannot put an obstacle at ({y}, {x})")
+        row = self.row_obstacles[y]
+        idx = bisect_left(row, x)
+        if idx < len(row) and row[idx] == x:
+            return
+        row.insert(idx, x)
+        insort(self.col_obstacles[x], y)
+        # the path changes from the first segment walking through it
+        first = self.first_covering(y, x)
+        if first != -1:
+            self.walk(first)
+
+    def remove_obstacle(self, y: int, x: int) -> None:
+        row = self.row_obstacles[y] if 0 <= y < self.height else []
+        idx = bisect_left(row, x)
+        if idx == len(row) or row[idx] != x:
+            return
+        del row[idx]
+        self.col_obstacles[x].remove(y)
+        # the path changes from the first segment it stopped
+        cell = y * self.width + x
+        if cell in self.blockers:
+            self.walk(self.blockers[cell])
+
+    def first_covering(self, y: int, x: int) -> int:
+        cell = y * self.width + x
+        first: int = -1
+        for segments in (self.row_segments.get(y, ()), self.col_segments.get(x, ())):
+            for idx in segments:
+                if min(self.seg_starts[idx], self.seg_stops[idx]) <= cell <= \
+                        max(self.seg_starts[idx], self.seg_stops[idx]):
+                    if first == -1 or idx < first:
+                        first = idx
+                    break
+        return first
+
+    def next_stop(self, pos: int, dm_idx: int) -> Tuple[int, bool]:
+        # last cell walking from pos in dm_idx, and whether an obstacle (not
+        # the edge of the map) ends the walk there
+        width = self.width
+        y, x = divmod(pos, width)
+        if dm_idx == 0:
+            column = self.col_obstacles[x]
+            idx = bisect_left(column, y)
+            return ((column[idx - 1] + 1) * width + x, True) if idx else (x, False)
+        if dm_idx == 1:
+            row = self.row_obstacles[y]
+            idx = bisect_right(row, x)
+            if idx < len(row):
+                return (y * width + row[idx] - 1, True)
+            return (y * width + width - 1, False)
+        if dm_idx == 2:
+            column = self.col_obstacles[x]
+            idx = bisect_right(column, y)
+            if idx < len(column):
+                return ((column[idx] - 1) * width + x, True)
+            return ((self.height - 1) * width + x, False)
+        row = self.row_obstacles[y]
+        idx = bisect_left(row, x)
+        return (y * width + row[idx - 1] + 1, True) if idx else (y * width, False)
+
+    def cover(self, idx: int, delta: int) -> None:
+        # add delta (1 or -1) to the visit count of every cell of segment
+        # idx a slice at a time, keeping visited in step as cells gain
+        # their first visit or lose their last
+        start, stop = self.seg_starts[idx], self.seg_stops[idx]
+        step = self.width if self.seg_dirs[idx] % 2 == 0 else 1
+        cells = slice(min(start, stop), max(start, stop) + 1, step)
+        counts = self.visits[cells]
+        if delta > 0:
+            self.visited += counts.count(0)
+            self.visits[cells] = counts.translate(INCREMENT)
+        else:
+            self.visited -= counts.count(1)
+            self.visits[cells] = counts.translate(DECREMENT)
+
+    def truncate(self, first: int) -> None:
+        # drop segment first and everything after it
+        size, width = self.width * self.height, self.width
+        steps = (-width, 1, width, -1)
+        for idx in range(len(self.seg_starts) - 1, first - 1, -1):
+            dm_idx, stop = self.seg_dirs[idx], self.seg_stops[idx]
+            y, x = divmod(stop, width)
+            lines = self.col_segments[x] if dm_idx % 2 == 0 else self.row_segments[y]
+            lines.pop()
+            self.cover(idx, -1)
+            if self.blockers.get(stop + steps[dm_idx], -1) == idx:
+                del self.blockers[stop + steps[dm_idx]]
+            if self.turns.get(dm_idx * size + stop, -1) == idx:
+                del self.turns[dm_idx * size + stop]
+        del self.seg_starts[first:]
+        del self.seg_dirs[first:]
+        del self.seg_stops[first:]
+
+    def walk(self, first: int) -> None:
+        # re-walk the path from the start of segment first
+        if first < len(self.seg_starts):
+            pos, dm_idx = self.seg_starts[first], self.seg_dirs[first]
+        else:
+            pos, dm_idx = self.start, self.direction
+        self.truncate(first)
+        size, width = self.width * self.height, self.width
+        steps = (-width, 1, width, -1)
+        self.looped = False
+        while True:
+            idx = len(self.seg_starts)
+            stop, blocked = self.next_stop(pos, dm_idx)
+            self.seg_starts.append(pos)
+            self.seg_dirs.append(dm_idx)
+            self.seg_stops.append(stop)
+            if dm_idx % 2 == 0:
+                self.col_segments.setdefault(pos % width, []).append(idx)
+            else:
+                self.row_segments.setdefault(pos // width, []).append(idx)
+            self.cover(idx, 1)
+            if not blocked:
+                return
+            turn = dm_idx * size + stop
+            if turn in self.turns:
+                self.looped = True
+                return
+            self.turns[turn] = idx
+            self.blockers.setdefault(stop + steps[dm_idx], idx)
+            pos, dm_idx = stop, (dm_idx + 1) % 4
+
+
+def part1(grid: Grid) -> int:
+    lab: Lab = Lab(grid)
+    return len(lab.patrol()) + 1
+
+
+def part2(grid: Grid, workers: Optional[int] = None) -> int:
+    lab: Lab = Lab(grid)
+    # an obstacle only matters on the original path, and the guard is
+    # unaffected until reaching it, so each walk starts right in front of it
+    candidates = lab.patrol()
+    workers = workers or os.cpu_count() or 1
+    if len(candidates) < 4096:
+        workers = 1
+    chunk_size = -(-len(candidates) // (workers * 4))
+    return sum(map_chunks(count_loops_worker, candidates, max(chunk_size, 1), workers,
+                          init_worker, (lab,), local=lab.count_loops))
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day06.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day06.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day06.input")
+    test_file: str = os.path.join(root, "tests", "day06.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
-    mapped_area: List[List[str]]
+    grid: Grid
     if mode.strip().lower() == "input":
-        mapped_area = read_data(input_file)
-        p1_result = part1(copy.deepcopy(mapped_area))
-        p2_result = part2(copy.deepcopy(mapped_area))
+        grid = read_data(input_file)
+        p1_result = part1(grid)
+        p2_result = part2(grid)
         assert p1_result == 5409
         assert p2_result == 2022
     elif mode.strip().lower() == "test":
-        mapped_area = read_data(test_file)
-        p1_result = part1(copy.deepcopy(mapped_area))
-        p2_result = part2(copy.deepcopy(mapped_area))
+        grid = read_data(test_file)
+        p1_result = part1(grid)
+        p2_result = part2(grid)
         assert p1_result == 41
         assert p2_result == 6
     else:
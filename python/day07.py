@@ -1,84 +1,173 @@
 import os
 import sys
-from typing import List, DefaultDict
-from collections import defaultdict
+from abc import ABC, abstractmethod
+from array import array
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+from ints import parse_int_rows
+from parallel import map_chunks
 
-def read_data(file_name: str) -> DefaultDict[int, List[int]]:
-    lines: List[str] = []
-    with open(file_name, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
 
-    calibrations: DefaultDict[int, List[int]] = defaultdict(list)
-    for line in lines:
-        values = line.split(':')
-        calibrations[int(values[0].strip())] = [int(value.strip())
-                                                for value in values[1].strip().split()]
+def read_data(file_name: str, block_size: int = 1 << 20) -> Iterator[Tuple[int, array]]:
+    # one record per line, so equations sharing a target are all kept;
+    # the file is parsed a block of whole lines at a time to keep memory
+    # flat, which is also why it does not go through a sidecar
+    with open(file_name, "rb") as file:
+        while True:
+            block = b"".join(file.readlines(block_size))
+            if len(block) == 0:
+                return
+            values, offsets = parse_int_rows(block, b":")
+            for idx in range(len(offsets) - 1):
+                start, end = offsets[idx], offsets[idx + 1]
+                yield (values[start], values[start + 1:end])
 
-    return calibrations
 
+# undo result meaning the operands before it may evaluate to anything; an
+# object of its own, as every int is a possible left side
+ANY_LEFT: object = object()
+
+
+class Operator(ABC):
+    name: str
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    def apply(self, left: int, right: int) -> int:
+        ...
+
+    @abstractmethod
+    def undo(self, result: int, right: int) -> Union[int, object, None]:
+        # value the left side must have for apply(left, right) == result,
+        # None if no non-negative left side can produce it and ANY_LEFT if
+        # every left side does
+        ...
+
+
+class Add(Operator):
+    def apply(self, left: int, right: int) -> int:
+        return left + right
+
+    def undo(self, result: int, right: int) -> Optional[int]:
+        return result - right if result >= right else None
+
+
+class Multiply(Operator):
+    def apply(self, left: int, right: int) -> int:
+        return left * right
+
+    def undo(self, result: int, right: int) -> Union[int, object, None]:
+        if right == 0:
+            # anything times 0 is 0
+            return ANY_LEFT if result == 0 else None
+        if result % right != 0:
+            return None
+        return result // right
+
+
+class Concatenate(Operator):
+    def apply(self, left: int, right: int) -> int:
+        return left * power_of_ten(right) + right
+
+    def undo(self, result: int, right: int) -> Optional[int]:
+        scale = power_of_ten(right)
+        if result % scale != right:
+            return None
+        return result // scale
 
-def two_operator_check(target: int, nums: List[int], result: int) -> bool:
-    if result == target and len(nums) == 0:
-        return True
-    if len(nums) < 1:
-        return False
-    add = two_operator_check(target, nums[1:], result + nums[0])
-    mult = two_operator_check(target, nums[1:], result * nums[0])
-    if add or mult:
-        return True
-    return False
 
+def power_of_ten(num: int) -> int:
+    # smallest power of ten above num, i.e. the shift needed to append it
+    scale: int = 10
+    while scale <= num:
+        scale *= 10
+    return scale
 
-def three_operator_check(target: int, nums: List[int], result: int) -> bool:
-    if target == result and len(nums) == 0:
-        return True
-    if len(nums) < 1:
+
+OPERATORS: Dict[str, Operator] = {}
+
+
+def register_operator(operator: Operator) -> Operator:
+    OPERATORS[operator.name] = operator
+    return operator
+
+
+register_operator(Add("+"))
+register_operator(Multiply("*"))
+register_operator(Concatenate("||"))
+
+
+def is_solvable(target: int, nums: Sequence[int], operators: Sequence[Operator]) -> bool:
+    # work backwards from the target, undoing the last operand with every
+    # operator; divisibility, subtraction and suffix checks prune branches
+    if len(nums) == 0:
         return False
-    add: bool = three_operator_check(target, nums[1:], result + nums[0])
-    multi: bool = three_operator_check(target, nums[1:], result * nums[0])
-    concat: bool = three_operator_check(
-        target, nums[1:], int(str(result) + str(nums[0])))
-    if add or multi or concat:
-        return True
+    stack: List[Tuple[int, int]] = [(len(nums) - 1, target)]
+    while stack:
+        idx, result = stack.pop()
+        if idx == 0:
+            if result == nums[0]:
+                return True
+            continue
+        for operator in operators:
+            left = operator.undo(result, nums[idx])
+            if left is ANY_LEFT:
+                # the operands before always evaluate to something
+                return True
+            if left is not None:
+                stack.append((idx - 1, left))
     return False
 
 
-def part1(calibrations: DefaultDict[int, List[int]]) -> int:
+def solvable_total(calibrations: Iterable[Tuple[int, Sequence[int]]],
+                   operator_names: Sequence[str]) -> int:
+    operators = [OPERATORS[name] for name in operator_names]
     res: int = 0
-    for target, nums in calibrations.items():
-        if two_operator_check(target, nums[1:], nums[0]):
+    for target, nums in calibrations:
+        if is_solvable(target, nums, operators):
             res += target
     return res
 
 
-def part2(calibrations: DefaultDict[int, List[int]]) -> int:
-    res: int = 0
-    for target, nums in calibrations.items():
-        if two_operator_check(target, nums[1:], nums[0]):
-            res += target
-        elif three_operator_check(target, nums[1:], nums[0]):
-            res += target
-    return res
+def total_calibration(calibrations: Iterable[Tuple[int, Sequence[int]]],
+                      operator_names: Sequence[str],
+                      workers: Optional[int] = None, chunk_size: int = 4096) -> int:
+    return sum(map_chunks(partial(solvable_total, operator_names=operator_names),
+                          calibrations, chunk_size, workers))
+
+
+def part1(calibrations: Iterable[Tuple[int, Sequence[int]]]) -> int:
+    return total_calibration(calibrations, ("+", "*"))
+
+
+def part2(calibrations: Iterable[Tuple[int, Sequence[int]]]) -> int:
+    return total_calibration(calibrations, ("+", "*", "||"))
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day07.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day07.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day07.input")
+    test_file: str = os.path.join(root, "tests", "day07.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
-    calibrations: DefaultDict[int, List[int]]
     if mode.strip().lower() == "input":
-        calibrations = read_data(input_file)
-        pt1_result = part1(calibrations)
-        pt2_result = part2(calibrations)
+        pt1_result = part1(read_data(input_file))
+        pt2_result = part2(read_data(input_file))
         assert pt1_result == 882304362421
         assert pt2_result == 145149066755184
     elif mode.strip().lower() == "test":
-        calibrations = read_data(test_file)
-        pt1_result = part1(calibrations)
-        pt2_result = part2(calibrations)
+        pt1_result = part1(read_data(test_file))
+        pt2_result = part2(read_data(test_file))
         assert pt1_result == 3749
         assert pt2_result == 11387
+        # a trailing 0 operand multiplies any prefix down to 0
+        assert is_solvable(0, [5, 0], [OPERATORS["+"], OPERATORS["*"]])
+        assert is_solvable(0, [3, 4, 0], [OPERATORS["+"], OPERATORS["*"]])
+        # a left side of -1 is a real value, not the wildcard
+        assert not is_solvable(-3, [7, 3], [OPERATORS["+"], OPERATORS["*"]])
+        assert not is_solvable(-5, [5, 5], [OPERATORS["+"], OPERATORS["*"]])
     else:
         print(f"Usage: {os.sys.argv[0]} [test|input]", file=sys.stderr)
@@ -1,131 +1,148 @@
 import os
 import sys
-from typing import List, DefaultDict,  Set
+import math
+from typing import List, DefaultDict, Tuple
 from collections import defaultdict
 
+from grid import Grid
 
-def read_data(file_name: str) -> List[str]:
-    lines: List[str] = []
-    with open(file_name, "r") as file:
-        lines = [line.strip() for line in file.readlines()
-                 if len(line.strip(" \n\r\t")) != 0]
-    return lines
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
-class Position:
-    y: int
-    x: int
+def read_data(file_name: str) -> Grid:
+    return Grid.map_file(file_name)
 
-    def __init__(self, y: int = 0, x: int = 0):
-        self.y = y
-        self.x = x
 
-    def __repr__(self):
-        return f"y:{self.y}, x: {self.x}"
+EMPTY: int = ord(".")
 
-    def __eq__(self, other) -> bool:
-        return self.x == other.x and self.y == other.y
 
-    def __sub__(self, other):
-        new: Position = Position(self.y - other.y, self.x - other.x)
-        return new
+def tower_index(grid: Grid) -> DefaultDict[int, List[int]]:
+    # grid index of every tower, per frequency
+    towers: DefaultDict[int, List[int]] = defaultdict(list)
+    for y in range(grid.height):
+        start = grid.index(y, 0)
+        for x, freq in enumerate(grid.row(y)):
+            if freq != EMPTY:
+                towers[freq].append(start + x)
+    return towers
 
-    def __add__(self, other):
-        new: Position = Position(self.y + other.y, self.x + other.x)
-        return new
 
-    def __hash__(self):
-        return hash(self.x) ^ (hash(self.y) << 1)
-
-
-def get_antinodes_double_distance(first: Position, second: Position) -> (Position, Position):
-    diff = first - second
-    if first - diff == second:
-        left = second - diff
-        right = first + diff
-    if second - diff == first:
-        left = first - diff
-        right = second + diff
-    return left, right
-
-
-def part1(map: List[str]) -> int:
-    towers: DefaultDict[str, List[Position]
-                        ] = defaultdict(list)
-    # get location of all the towers and their frequency
-    for y, line in enumerate(map):
-        for x, char in enumerate(line):
-            if char == '.':
-                continue
-            else:
-                towers[str(char)].append((y, x))
-
-    antinodes: Set[Position] = set()
-    # for each frequency, get antinode location for each pair
-    for freq, nodes in towers.items():
-        for y in range(len(nodes)):
-            for x in range(y+1, len(nodes)):
-                first, second = get_antinodes_double_distance(
-                    Position(nodes[y][0], nodes[y][1]),
-                    Position(nodes[x][0], nodes[x][1]))
-                if 0 <= first.x < len(map[0]) and 0 <= first.y < len(map) and map[first.y][first.x] != freq:
-                    antinodes.add(first)
-                if 0 <= second.x < len(map[0]) and 0 <= second.y < len(map) and map[second.y][second.x] != freq:
-                    antinodes.add(second)
-    return len(antinodes)
-
-
-def get_antinodes_along_all_nodes(map: List[str], first: Position, second: Position):
-    res = set()
-    diff = first - second
-    while 0 <= first.x - diff.x < len(map[0]) and 0 <= first.y - diff.y < len(map):
-        res.add(first - diff)
-        first -= diff
-    while 0 <= second.x + diff.x < len(map[0]) and 0 <= second.y + diff.y < len(map):
-        res.add(second + diff)
-        second += diff
-    return res
-
-
-def part2(map: List[str]) -> int:
-    towers: DefaultDict[str, List[Position]
-                        ] = defaultdict(list)
-    # get location of all the towers and their frequency
-    for y, line in enumerate(map):
-        for x, char in enumerate(line):
-            if char == '.':
-                continue
-            else:
-                towers[str(char)].append((y, x))
-
-    antinodes: Set[Position] = set()
+def count_antinodes(grid: Grid) -> int:
+    antinodes: bytearray = bytearray(len(grid.cells))
     # for each frequency, get antinode location for each pair
-    for freq, nodes in towers.items():
-        for y in range(len(nodes)):
-            for x in range(y+1, len(nodes)):
-                positions = get_antinodes_along_all_nodes(map, Position(
-                    nodes[y][0], nodes[y][1]), Position(nodes[x][0], nodes[x][1]))
-                for pos in positions:
-                    if 0 <= pos.x < len(map[0]) and 0 <= pos.y < len(map):
-                        antinodes.add(pos)
-    return len(antinodes)
+    for freq, nodes in tower_index(grid).items():
+        for idx, first in enumerate(nodes):
+            first_y, first_x = grid.position(first)
+            for second in nodes[idx + 1:]:
+                second_y, second_x = grid.position(second)
+                for y, x in ((2 * first_y - second_y, 2 * first_x - second_x),
+                             (2 * second_y - first_y, 2 * second_x - first_x)):
+                    if grid.inside(y, x) and grid[grid.index(y, x)] != freq:
+                        antinodes[grid.index(y, x)] = 1
+    return antinodes.count(1)
+
+
+def count_harmonic_antinodes(grid: Grid) -> int:
+    antinodes: bytearray = bytearray(len(grid.cells))
+    # every grid point on the line through a pair, stepping by the smallest
+    # whole step along it
+    for nodes in tower_index(grid).values():
+        for idx, first in enumerate(nodes):
+            first_y, first_x = grid.position(first)
+            for second in nodes[idx + 1:]:
+                second_y, second_x = grid.position(second)
+                step_y, step_x = second_y - first_y, second_x - first_x
+                divisor = math.gcd(step_y, step_x)
+                step_y, step_x = step_y // divisor, step_x // divisor
+                for sign in (1, -1):
+                    y, x = first_y, first_x
+                    while grid.inside(y, x):
+                        antinodes[grid.index(y, x)] = 1
+                        y += sign * step_y
+                        x += sign * step_x
+    return antinodes.count(1)
+
+
+def antinode_counts(grid: Grid, block_cells: int = 1 << 22) -> Tuple[int, int]:
+    # answers to both parts from one pass over the tower index, handling all
+    # pairs of a frequency at once as arrays
+    if np is None:
+        return (count_antinodes(grid), count_harmonic_antinodes(grid))
+    height: int = grid.height
+    width: int = grid.width
+    cells = grid.array()
+    antinodes = np.zeros((height, width), dtype=bool)
+    harmonics = np.zeros((height, width), dtype=bool)
+    reach = max(height, width)
+    for freq, nodes in tower_index(grid).items():
+        ys, xs = np.divmod(np.array(nodes, dtype=np.int64) - grid.origin, grid.stride)
+        first, second = np.triu_indices(len(nodes), 1)
+        delta_y, delta_x = ys[second] - ys[first], xs[second] - xs[first]
+
+        y = np.concatenate([ys[first] - delta_y, ys[second] + delta_y])
+        x = np.concatenate([xs[first] - delta_x, xs[second] + delta_x])
+        inside = (y >= 0) & (y < height) & (x >= 0) & (x < width)
+        y, x = y[inside], x[inside]
+        keep = cells[y, x] != freq
+        antinodes[y[keep], x[keep]] = True
+
+        divisor = np.gcd(delta_y, delta_x)
+        step_y, step_x = delta_y // divisor, delta_x // divisor
+        # a line crosses the grid in at most reach // span steps either way,
+        # so pairs are blocked by span; walking from the shortest span, the
+        # first pair of a block needs the most multiples, which bounds both
+        # the block's size and the multiples every pair in it tries
+        span = np.maximum(np.abs(step_y), np.abs(step_x))
+        order = np.argsort(span, kind="stable")
+        start: int = 0
+        while start < len(order):
+            count = reach // int(span[order[start]])
+            block = max(1, block_cells // (2 * count + 1))
+            pairs = order[start:start + block]
+            multiples = np.arange(-count, count + 1)
+            y = ys[first[pairs], None] + multiples[None, :] * step_y[pairs, None]
+            x = xs[first[pairs], None] + multiples[None, :] * step_x[pairs, None]
+            inside = (y >= 0) & (y < height) & (x >= 0) & (x < width)
+            harmonics[y[inside], x[inside]] = True
+            start += len(pairs)
+    return (int(np.count_nonzero(antinodes)), int(np.count_nonzero(harmonics)))
+
+
+# below this many cells array setup costs more than the scalar walks save
+NUMPY_MIN_CELLS: int = 1 << 16
+
+
+def part1(grid: Grid) -> int:
+    if np is None or grid.height * grid.width < NUMPY_MIN_CELLS:
+        return count_antinodes(grid)
+    return antinode_counts(grid)[0]
+
+
+def part2(grid: Grid) -> int:
+    if np is None or grid.height * grid.width < NUMPY_MIN_CELLS:
+        return count_harmonic_antinodes(grid)
+    return antinode_counts(grid)[1]
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day08.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day08.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day08.input")
+    test_file: str = os.path.join(root, "tests", "day08.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     if mode.strip().lower() == "input":
-        map = read_data(input_file)
-        pt1_result = part1(map)
-        pt2_result = part2(map)
+        grid = read_data(input_file)
+        pt1_result = part1(grid)
+        pt2_result = part2(grid)
         assert pt1_result == 256
         assert pt2_result == 1005
     elif mode.strip().lower() == "test":
-        map = read_data(test_file)
-        pt1_result = part1(map)
-        pt2_result = part2(map)
+        grid = read_data(test_file)
+        pt1_result = part1(grid)
+        pt2_result = part2(grid)
         assert pt1_result == 14
         assert pt2_result == 34
     else:
@@ -1,20 +1,8 @@
 import os
 import sys
-from typing import List, Optional, Union
-
-
-class FilePage:
-    file_id: int
-    file_size: int
-    space_after: int
-
-    def __init__(self, file_id: int, file_size: int, space_after: int = 0):
-        self.file_id = file_id
-        self.file_size = file_size
-        self.space_after = space_after
-
-    def __repr__(self) -> str:
-        return str(self.file_id) * self.file_size + '.' * self.space_after
+import heapq
+import mmap
+from typing import List, Tuple, Union
 
 
 def read_data(file_name: str) -> str:
@@ -24,119 +12,128 @@ def read_data(file_name: str) -> str:
     return input_data
 
 
-def uncompress_memory(data: str) -> List[str]:
-    memory: List[str] = []
-    file_id: int = 0
-    isFile: bool = True
-    for char in data:
-        if (isFile):
-            memory += ([f"{file_id}"] * int(char))
-            isFile = False
-            file_id += 1
+def span_checksum(file_id: int, start: int, size: int) -> int:
+    # sum of file_id * block position over size blocks placed from start
+    return file_id * (size * start + size * (size - 1) // 2)
+
+
+def compact_checksum(data: Union[bytes, mmap.mmap]) -> int:
+    # walk the run-length spans from both ends: the left pointer moves over
+    # the final layout, the right pointer hands out blocks of the last files
+    digit = ord("0")
+    length: int = len(data)
+    while length > 0 and not (digit <= data[length - 1] <= digit + 9):
+        length -= 1
+    if length == 0:
+        return 0
+    left: int = 0
+    right: int = length - 1 if (length - 1) % 2 == 0 else length - 2
+    remaining: int = data[right] - digit
+    position: int = 0
+    checksum: int = 0
+    while left < right:
+        size = data[left] - digit
+        if left % 2 == 0:
+            checksum += span_checksum(left // 2, position, size)
+            position += size
         else:
-            memory += (["."] * int(char))
-            isFile = True
-    return memory
+            while size > 0:
+                if remaining == 0:
+                    right -= 2
+                    if right <= left:
+                        break
+                    remaining = data[right] - digit
+                    continue
+                moved = min(size, remaining)
+                checksum += span_checksum(right // 2, position, moved)
+                position += moved
+                size -= moved
+                remaining -= moved
+        left += 1
+    if left == right:
+        checksum += span_checksum(right // 2, position, remaining)
+    return checksum
 
 
-def calculate_checksum(memory: Union[List[str], List[FilePage]]) -> int:
-    checksum: int = 0
-    if memory is not None and all(isinstance(file_page, FilePage) for file_page in memory):
-        idx: int = 0
-        for file_page in memory:
-            start_idx = idx
-            for i in range(start_idx, start_idx + file_page.file_size):
-                checksum += idx * file_page.file_id
-                idx += 1
-            idx += file_page.space_after
-    elif memory is not None and all(isinstance(file_page, str) for file_page in memory):
-        first_blank = memory.index(".")
-        for idx, value in enumerate(memory[:first_blank]):
-            checksum += idx * int(value)
-    else:
-        raise Exception("InvalidType")
-    return checksum
+def part1(data: str) -> int:
+    return compact_checksum(data.encode("ascii"))
+
 
+def part1_mapped(file_name: str) -> int:
+    # same as part1 without loading the disk map into memory
+    with open(file_name, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return compact_checksum(data)
 
-def part1(memory: List[str]) -> int:
-    start: int = 0
-    end: int = len(memory)-1
-    while start < end:
-        while memory[start] != ".":
-            start += 1
-        while not memory[end].isdigit():
-            end -= 1
-        if start >= end:
-            break
-        temp = memory[start]
-        memory[start] = memory[end]
-        memory[end] = temp
-    return calculate_checksum(memory)
-
-
-def construct_file_pages(data: str) -> List[FilePage]:
-    file_pages: List[FilePage] = []
-    file_id: int = 0
+
+def part2(data: str) -> int:
+    file_starts: List[int] = []
+    file_sizes: List[int] = []
+    spans: List[Tuple[int, int]] = []
+    position: int = 0
+    span_start: int = 0
     for idx, char in enumerate(data):
-        file: FilePage = None
+        size = ord(char) - ord("0")
         if idx % 2 == 0:
-            file = FilePage(file_id, int(char))
-            file_pages.append(file)
-            file_id += 1
-        else:
-            file_pages[-1].space_after = int(char)
-    return file_pages
-
-
-def part2(file_pages: List[FilePage]) -> int:
-    end = len(file_pages) - 1
-    while end > 0:
-        start = 0
-        while file_pages[start].space_after < file_pages[end].file_size and start < end:
-            start += 1
-        if start >= end:
-            end -= 1
-            continue
-        end_page = file_pages[end]
-        file_pages[end-1].space_after += file_pages[end].file_size + \
-            file_pages[end].space_after
-        end_page.space_after = file_pages[start].space_after - \
-            end_page.file_size
-        file_pages.remove(file_pages[end])
-        file_pages[start].space_after = 0
-        file_pages.insert(start+1, end_page)
+            file_starts.append(position)
+            file_sizes.append(size)
+            # an empty file leaves the free blocks around it as one span
+            if size > 0:
+                if position > span_start:
+                    spans.append((span_start, position - span_start))
+                span_start = position + size
+        position += size
+
+    # free spans by length (at most 9 unless empty files joined them), each
+    # a min-heap of span starts, already heap-ordered as spans run left to right
+    free_spans: List[List[int]] = [
+        [] for _ in range(max([9] + [size for _, size in spans]) + 1)]
+    for start, size in spans:
+        free_spans[size].append(start)
 
-    return calculate_checksum(file_pages)
+    checksum: int = 0
+    for file_id in range(len(file_starts) - 1, -1, -1):
+        start, size = file_starts[file_id], file_sizes[file_id]
+        if size == 0:
+            continue
+        # leftmost span that fits, among the heads of every large enough size
+        span_size: int = 0
+        for candidate in range(size, len(free_spans)):
+            starts = free_spans[candidate]
+            if starts and starts[0] < start:
+                start = starts[0]
+                span_size = candidate
+        if span_size:
+            heapq.heappop(free_spans[span_size])
+            if span_size > size:
+                heapq.heappush(free_spans[span_size - size], start + size)
+        checksum += span_checksum(file_id, start, size)
+    return checksum
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day09.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day09.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day09.input")
+    test_file: str = os.path.join(root, "tests", "day09.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     if mode.strip().lower() == "input":
         compressed_memory = read_data(input_file)
 
-        uncompressed = uncompress_memory(compressed_memory)
-        pt1_result = part1(uncompressed)
+        pt1_result = part1(compressed_memory)
         assert pt1_result == 6330095022244
+        assert part1_mapped(input_file) == pt1_result
 
-        file_pages: List[FilePage] = construct_file_pages(compressed_memory)
-        pt2_result = part2(file_pages)
+        pt2_result = part2(compressed_memory)
         assert pt2_result == 6359491814941
     elif mode.strip().lower() == "test":
         compressed_memory = read_data(test_file)
 
-        uncompressed = uncompress_memory(compressed_memory)
-        assert "".join(
-            uncompressed) == "00...111...2...333.44.5555.6666.777.888899"
-        pt1_result = part1(uncompressed)
+        pt1_result = part1(compressed_memory)
         assert pt1_result == 1928
+        assert part1_mapped(test_file) == pt1_result
 
-        file_pages: List[FilePage] = construct_file_pages(compressed_memory)
-        assert "".join(
-            [str(page) for page in file_pages]) == "00...111...2...333.44.5555.6666.777.888899"
-        pt2_result = part2(file_pages)
+        pt2_result = part2(compressed_memory)
         assert pt2_result == 2858
     else:
         print(f"Usage: {os.sys.argv[0]} [test|input]", file=sys.stderr)
@@ -1,107 +1,99 @@
 import os
 import sys
-from typing import List, Set, Tuple
-
-
-def read_data(filename: str) -> List[str]:
-    lines: List[str] = []
-    with open(filename) as file:
-        lines = [line.strip(" \r\n\t") for line in file.readlines()]
-    return lines
-
-
-def parse_map(lines: List[str]) -> List[List[int]]:
-    map: List[List[int]] = []
-    for line in lines:
-        row: List[int] = [int(char) for char in line]
-        map.append(row)
-    return map
-
-
-def traverse(map: List[List[int]], y: int, x: int, destinations: Set[Tuple[int, int]]) -> None:
-    assert y >= 0
-    assert x >= 0
-    if (map[y][x] == 9):
-        if isinstance(destinations, set):
-            destinations.add((y, x))
-        elif isinstance(destinations, list):
-            destinations.append((y, x))
-        return
-    # up
-    if y > 0 and map[y][x]+1 == map[y-1][x]:
-        traverse(map, y-1, x, destinations)
-    # right
-    if x < len(map[y])-1 and map[y][x]+1 == map[y][x+1]:
-        traverse(map, y, x+1, destinations)
-    # down
-    if y < len(map)-1 and map[y][x]+1 == map[y+1][x]:
-        traverse(map, y+1, x, destinations)
-    # right
-    if x > 0 and map[y][x]+1 == map[y][x-1]:
-        traverse(map, y, x-1, destinations)
-
-
-def get_score(map: List[List[int]], y: int, x: int) -> int:
-    destinations: Set[Tuple[int, int]] = set()
-    traverse(map, y, x, destinations)
-    return len(destinations)
-
-
-def part1(map: List[List[int]]) -> int:
-    total_score: int = 0
-    for y, row in enumerate(map):
-        for x, cell in enumerate(row):
-            if cell == 0:
-                score = get_score(map, y, x)
-                total_score += score
-    return total_score
-
-
-def get_rating(map: List[List[int]], y: int, x: int):
-    paths = list()
-    traverse(map, y, x, paths)
-    return len(paths)
-
-
-def part2(map: List[List[int]]) -> int:
-    total_score: int = 0
-    for y, row in enumerate(map):
-        for x, cell in enumerate(row):
-            if cell == 0:
-                score = get_rating(map, y, x)
-                total_score += score
-    return total_score
+from typing import Callable, Dict, List
+
+from grid import Grid
+
+
+ZERO: int = ord("0")
+
+
+def read_data(filename: str) -> Grid:
+    return Grid.map_file(filename)
+
+
+def climb(grid: Grid, peak: int,
+          combine: Callable[[int, int, int], int]) -> List[int]:
+    # dynamic programming one height at a time from the peaks down: every
+    # cell folds in the values of its neighbours one step higher with
+    # combine(total, value, direction), keeping only the layer above around;
+    # cells off the map are never in a layer, so as long as rows are kept
+    # apart by sentinels, neighbours need no bounds checks
+    layers: List[List[int]] = [[] for _ in range(10)]
+    for y in range(grid.height):
+        start = grid.index(y, 0)
+        for x, cell in enumerate(grid.row(y)):
+            if ZERO <= cell <= ZERO + 9:
+                layers[cell - ZERO].append(start + x)
+
+    # up, right, down, left
+    neighbours = list(enumerate(grid.offsets[:4]))
+    values: Dict[int, int] = {idx: peak for idx in layers[9]}
+    for level in range(8, -1, -1):
+        lower: Dict[int, int] = {}
+        for idx in layers[level]:
+            total: int = 0
+            for direction, offset in neighbours:
+                if idx + offset in values:
+                    total = combine(total, values[idx + offset], direction)
+            if total:
+                lower[idx] = total
+        values = lower
+    return list(values.values())
+
+
+# Peaks are at most 9 steps from a trailhead, so the peaks a cell reaches
+# are kept as a bitset over their offset from that cell: bit
+# (dy + 9) * PEAK_STRIDE + (dx + 9). Rows are wider than the 19 possible
+# columns so moving to a neighbour is a plain shift that never wraps.
+PEAK_STRIDE: int = 32
+PEAK_SHIFTS: List[Callable[[int], int]] = [
+    lambda peaks: peaks >> PEAK_STRIDE,  # from the cell above
+    lambda peaks: peaks << 1,  # from the cell to the right
+    lambda peaks: peaks << PEAK_STRIDE,  # from the cell below
+    lambda peaks: peaks >> 1,  # from the cell to the left
+]
+
+
+def part1(grid: Grid) -> int:
+    # each trailhead gets the set of peaks it reaches
+    reached = climb(grid, 1 << (9 * PEAK_STRIDE + 9),
+                    lambda total, peaks, direction: total | PEAK_SHIFTS[direction](peaks))
+    return sum(peaks.bit_count() for peaks in reached)
+
+
+def part2(grid: Grid) -> int:
+    # each trailhead gets the number of distinct trails up to any peak
+    return sum(climb(grid, 1, lambda total, trails, direction: total + trails))
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day10.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day10.test"
-    sample_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day10.sample"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day10.input")
+    test_file: str = os.path.join(root, "tests", "day10.test")
+    sample_file: str = os.path.join(root, "tests", "day10.sample")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     if mode.strip().lower() == "input":
-        data: List[str] = read_data(input_file)
-        map: List[List[int]] = parse_map(data)
+        grid: Grid = read_data(input_file)
 
-        pt1_result = part1(map)
+        pt1_result = part1(grid)
         assert pt1_result == 646
 
-        pt2_result = part2(map)
+        pt2_result = part2(grid)
         assert pt2_result == 1494
     elif mode.strip().lower() == "test":
-        data: List[str] = read_data(test_file)
-        map: List[List[int]] = parse_map(data)
+        grid: Grid = read_data(test_file)
 
-        pt1_result = part1(map)
+        pt1_result = part1(grid)
         assert pt1_result == 36
 
-        pt2_result = part2(map)
+        pt2_result = part2(grid)
         assert pt2_result == 81
     elif mode.strip().lower() == "sample":
-        data: List[str] = read_data(sample_file)
-        map: List[List[int]] = parse_map(data)
+        grid: Grid = read_data(sample_file)
 
-        sample_result = part1(map)
+        sample_result = part1(grid)
         assert sample_result == 1
     else:
         print(f"Usage: {os.sys.argv[0]} [test|input]", file=sys.stderr)
@@ -1,49 +1,70 @@
 import os
 import sys
-from typing import List
-import copy
+from typing import Iterator, List, Tuple
+from collections import Counter
+from functools import lru_cache
+
+from ints import read_ints
 
 
 def read_data(filename: str):
-    line: List[int] = []
-    with open(filename, "r") as file:
-        data = file.read()
-        line = [int(num) for num in data.strip(" \r\n\t").split(" ")]
+    line: List[int] = list(read_ints(filename))
     return line
 
 
-def blink(line: List[int]) -> List[int]:
-    idx: int = 0
-    while idx < len(line):
-        if line[idx] == 0:
-            line[idx] = 1
-        elif len(str(line[idx])) % 2 == 0:
-            num_str = str(line[idx])
-            num_len = len(num_str)
-            line = line[:idx] + [int(num_str[:num_len//2]),
-                                 int(num_str[(num_len//2):])] + line[idx+1:]
-            idx += 1
-        else:
-            line[idx] *= 2024
-        idx += 1
-    return line
+@lru_cache(maxsize=1 << 16)
+def transform(stone: int) -> Tuple[int, ...]:
+    # the stones a single stone turns into after one blink
+    if stone == 0:
+        return (1,)
+    num_str = str(stone)
+    num_len = len(num_str)
+    if num_len % 2 == 0:
+        return (int(num_str[:num_len//2]), int(num_str[num_len//2:]))
+    return (stone * 2024,)
 
 
-def part1(line: List[int], blink_count: int) -> int:
+def blink(stones: Counter[int]) -> Counter[int]:
+    # order of the stones never affects the count, so only track how many
+    # stones carry each engraved value
+    next_stones: Counter[int] = Counter()
+    for stone, count in stones.items():
+        for new_stone in transform(stone):
+            next_stones[new_stone] += count
+    return next_stones
+
+
+def blink_stream(line: List[int], blink_count: int) -> Iterator[Counter[int]]:
+    stones: Counter[int] = Counter(line)
     for _ in range(blink_count):
-        line = blink(line)
-    return len(line)
+        stones = blink(stones)
+        yield stones
+
+
+def stone_counts(line: List[int], blink_count: int) -> Iterator[int]:
+    for stones in blink_stream(line, blink_count):
+        yield sum(stones.values())
+
+
+def histogram(line: List[int], blink_count: int) -> Counter[int]:
+    stones: Counter[int] = Counter(line)
+    for stones in blink_stream(line, blink_count):
+        pass
+    return stones
+
+
+def part1(line: List[int], blink_count: int) -> int:
+    return sum(histogram(line, blink_count).values())
 
 
 def part2(line: List[int], blink_count: int) -> int:
-    for _ in range(blink_count):
-        line = blink(line)
-    return len(line)
+    return sum(histogram(line, blink_count).values())
 
 
 if __name__ == "__main__":
-    input_file: str = "/home/mohitjangra/learning/advent_of_code_2024/inputs/day11.input"
-    test_file: str = "/home/mohitjangra/learning/advent_of_code_2024/tests/day11.test"
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day11.input")
+    test_file: str = os.path.join(root, "tests", "day11.test")
 
     mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
     if mode.strip().lower() == "input":
@@ -53,8 +74,7 @@ if __name__ == "__main__":
         assert pt1_result == 185894
 
         pt2_result = part2(line, 75)
-        print(pt2_result)
-        # assert pt2_result ==
+        assert pt2_result == 221632504974231
     elif mode.strip().lower() == "test":
         line: List[int] = read_data(test_file)
 
@@ -0,0 +1,171 @@
+import os
+import sys
+from array import array
+from typing import List, Tuple
+
+from grid import Grid
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def read_data(filename: str) -> List[str]:
+    lines: List[str] = []
+    with open(filename) as file:
+        lines = [line.strip(" \r\n\t") for line in file.readlines()]
+    return [line for line in lines if len(line) != 0]
+
+
+def find(parent: array, label: int) -> int:
+    while parent[label] != label:
+        parent[label] = parent[parent[label]]
+        label = parent[label]
+    return label
+
+
+def union(parent: array, first: int, second: int) -> None:
+    # the larger root always points at the smaller one, so parent[label]
+    # never exceeds label
+    first, second = find(parent, first), find(parent, second)
+    if first < second:
+        parent[second] = first
+    elif second < first:
+        parent[first] = second
+
+
+def label_regions(cells: bytearray, width: int) -> Tuple[array, int]:
+    # one raster pass gives every cell a provisional label shared with its
+    # left or upper neighbour, merging the two when both hold the same
+    # plant, then the labels are resolved to region numbers 0..count - 1
+    labels = array('l', [-1]) * len(cells)
+    parent = array('l')
+    for idx in range(width, len(cells) - width):
+        plant = cells[idx]
+        if plant == 0:
+            continue
+        if cells[idx - 1] == plant:
+            label = labels[idx - 1]
+            if cells[idx - width] == plant and labels[idx - width] != label:
+                union(parent, label, labels[idx - width])
+        elif cells[idx - width] == plant:
+            label = labels[idx - width]
+        else:
+            label = len(parent)
+            parent.append(label)
+        labels[idx] = label
+
+    # parents come before their children, so one forward pass resolves all
+    region = array('l', [0]) * len(parent)
+    count: int = 0
+    for label in range(len(parent)):
+        if parent[label] == label:
+            region[label] = count
+            count += 1
+        else:
+            region[label] = region[parent[label]]
+    for idx, label in enumerate(labels):
+        if label != -1:
+            labels[idx] = region[label]
+    return (labels, count)
+
+
+def measure_numpy(cells: bytearray, width: int, labels: array,
+                  count: int) -> Tuple[List[int], List[int], List[int]]:
+    grid = np.frombuffer(bytes(cells), dtype=np.uint8).reshape(-1, width)
+    region = np.frombuffer(labels, dtype=f"i{labels.itemsize}")
+    region = region.reshape(-1, width)[1:-1, 1:-1].ravel()
+    plant = grid[1:-1, 1:-1]
+
+    def same(dy: int, dx: int):
+        return grid[1 + dy:grid.shape[0] - 1 + dy, 1 + dx:width - 1 + dx] == plant
+
+    up, right, down, left = same(-1, 0), same(0, 1), same(1, 0), same(0, -1)
+    fences = 4 - (up.astype(np.uint8) + right + down + left)
+    # a corner is convex when both sides around it differ and concave when
+    # both match but the diagonal between them does not
+    corners = np.zeros(plant.shape, dtype=np.uint8)
+    for first, second, diagonal in ((up, right, same(-1, 1)), (right, down, same(1, 1)),
+                                    (down, left, same(1, -1)), (left, up, same(-1, -1))):
+        corners += (~first & ~second) | (first & second & ~diagonal)
+    return (np.bincount(region, minlength=count).tolist(),
+            np.bincount(region, weights=fences.ravel(), minlength=count).astype(np.int64).tolist(),
+            np.bincount(region, weights=corners.ravel(), minlength=count).astype(np.int64).tolist())
+
+
+def measure_python(cells: bytearray, width: int, labels: array,
+                   count: int) -> Tuple[List[int], List[int], List[int]]:
+    areas: List[int] = [0] * count
+    perimeters: List[int] = [0] * count
+    sides: List[int] = [0] * count
+    for idx in range(width, len(cells) - width):
+        plant = cells[idx]
+        if plant == 0:
+            continue
+        up = cells[idx - width] == plant
+        right = cells[idx + 1] == plant
+        down = cells[idx + width] == plant
+        left = cells[idx - 1] == plant
+        # a region has as many sides as corners
+        corners: int = 0
+        if up == right and (not up or cells[idx - width + 1] != plant):
+            corners += 1
+        if right == down and (not right or cells[idx + width + 1] != plant):
+            corners += 1
+        if down == left and (not down or cells[idx + width - 1] != plant):
+            corners += 1
+        if left == up and (not left or cells[idx - width - 1] != plant):
+            corners += 1
+        region = labels[idx]
+        areas[region] += 1
+        perimeters[region] += 4 - up - right - down - left
+        sides[region] += corners
+    return (areas, perimeters, sides)
+
+
+def measure_regions(map: List[str]) -> Tuple[List[int], List[int], List[int]]:
+    # area, perimeter and number of sides of every region
+    grid = Grid.from_lines(map)
+    cells, width = grid.cells, grid.stride
+    labels, count = label_regions(cells, width)
+    if np is None:
+        return measure_python(cells, width, labels, count)
+    return measure_numpy(cells, width, labels, count)
+
+
+def part1(map: List[str]) -> int:
+    areas, perimeters, _ = measure_regions(map)
+    return sum(area * perimeter for area, perimeter in zip(areas, perimeters))
+
+
+def part2(map: List[str]) -> int:
+    areas, _, sides = measure_regions(map)
+    return sum(area * side for area, side in zip(areas, sides))
+
+
+if __name__ == "__main__":
+    root: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_file: str = os.path.join(root, "inputs", "day12.input")
+    test_file: str = os.path.join(root, "tests", "day12.test")
+    sample1_file: str = os.path.join(root, "tests", "day12.sample1")
+    sample2_file: str = os.path.join(root, "tests", "day12.sample2")
+
+    mode = os.sys.argv[1] if len(os.sys.argv) > 1 else "test"
+    if mode.strip().lower() == "input":
+        map: List[str] = read_data(input_file)
+        assert part1(map) == 1465112
+        assert part2(map) == 893790
+    elif mode.strip().lower() == "test":
+        map: List[str] = read_data(test_file)
+        assert part1(map) == 1930
+        assert part2(map) == 1206
+    elif mode.strip().lower() == "sample":
+        map: List[str] = read_data(sample1_file)
+        assert part1(map) == 140
+        assert part2(map) == 80
+        map = read_data(sample2_file)
+        assert part1(map) == 772
+        assert part2(map) == 436
+    else:
+        print(f"Usage: {os.sys.argv[0]} [test|input|sample]", file=sys.stderr)
@@ -0,0 +1,153 @@
+import mmap
+from typing import List, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Grid:
+    # cell (y, x) is cells[origin + y * stride + x], so stepping to a
+    # neighbour is adding one of the flat offsets
+    width: int
+    height: int
+    stride: int
+    origin: int
+    # rows and columns of sentinel bytes around the cells; a mapped file
+    # only has its newlines, one sentinel column between rows
+    border: int
+    sentinel: int
+    cells: Union[bytearray, mmap.mmap]
+    # set while cells are shared with a clone or backed by a read only
+    # mapping, the first write then takes a private copy
+    shared: bool
+
+    def __init__(self, cells: Union[bytearray, mmap.mmap], width: int, height: int,
+                 stride: int, origin: int = 0, border: int = 0, sentinel: int = 0,
+                 shared: bool = False):
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.origin = origin
+        self.border = border
+        self.sentinel = sentinel
+        self.shared = shared
+
+    @classmethod
+    def from_rows(cls, rows: List[bytes], border: int = 1, sentinel: int = 0) -> "Grid":
+        rows = [row for row in rows if len(row) != 0]
+        width: int = len(rows[0]) if rows else 0
+        stride: int = width + 2 * border
+        edge = bytes([sentinel]) * border
+        cells = bytearray(bytes([sentinel]) * (border * stride))
+        for row in rows:
+            cells += edge + row + edge
+        cells += bytes([sentinel]) * (border * stride)
+        return cls(cells, width, len(rows), stride, border * stride + border,
+                   border, sentinel)
+
+    @classmethod
+    def from_lines(cls, lines: List[str], border: int = 1, sentinel: int = 0) -> "Grid":
+        return cls.from_rows([line.strip().encode() for line in lines], border, sentinel)
+
+    @classmethod
+    def read(cls, file_name: str, border: int = 1, sentinel: int = 0) -> "Grid":
+        with open(file_name, "rb") as file:
+            return cls.from_rows(file.read().split(), border, sentinel)
+
+    @classmethod
+    def map_file(cls, file_name: str) -> "Grid":
+        # the file itself as the grid, without copying: rows are one
+        # newline apart, which leaves a sentinel column on either side of
+        # every row but none above or below, and no final one when the
+        # file does not end in a newline; files that are not evenly laid
+        # out are read into a bordered grid instead.  Stepping off the
+        # first or last row through grid[...] gives the sentinel, but code
+        # indexing cells directly has to bounds check those rows itself
+        with open(file_name, "rb") as file:
+            try:
+                cells = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return cls.read(file_name, 1, ord("\n"))
+        width: int = cells.find(b"\n")
+        if width == -1:
+            width = len(cells)
+        if width > 0 and cells[width - 1] == ord("\r"):
+            return cls.read(file_name, 1, ord("\n"))
+        stride: int = width + 1
+        height: int = (len(cells) + 1) // stride
+        if width <= 0 or len(cells) not in (height * stride, height * stride - 1) or \
+                any(cells[y * stride + width] != ord("\n") for y in range(height - 1)):
+            return cls.read(file_name, 1, ord("\n"))
+        return cls(cells, width, height, stride, 0, 0, ord("\n"), shared=True)
+
+    @property
+    def offsets(self) -> Tuple[int, ...]:
+        # up, right, down, left, then up-right, down-right, down-left, up-left;
+        # with border == 0 (a mapped file) an offset from the first or last
+        # row can leave cells, wrapping round through a negative index or
+        # past the end, so only grid[...] is safe to use there
+        stride = self.stride
+        return (-stride, 1, stride, -1, 1 - stride, stride + 1, stride - 1, -stride - 1)
+
+    def index(self, y: int, x: int) -> int:
+        return self.origin + y * self.stride + x
+
+    def position(self, idx: int) -> Tuple[int, int]:
+        return divmod(idx - self.origin, self.stride)
+
+    def inside(self, y: int, x: int) -> bool:
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def __getitem__(self, idx: int) -> int:
+        # anything outside the buffer reads as sentinel, as the missing
+        # rows above and below a mapped file would
+        if 0 <= idx < len(self.cells):
+            return self.cells[idx]
+        return self.sentinel
+
+    def __setitem__(self, idx: int, value: int) -> None:
+        if self.shared:
+            self.cells = bytearray(self.cells)
+            self.shared = False
+        self.cells[idx] = value
+
+    def clone(self) -> "Grid":
+        # both grids share the cells until either one writes
+        self.shared = True
+        return Grid(self.cells, self.width, self.height, self.stride,
+                    self.origin, self.border, self.sentinel, shared=True)
+
+    def padded(self, border: int, sentinel: int = 0) -> "Grid":
+        return Grid.from_rows(self.rows(), border, sentinel)
+
+    def find(self, value: bytes) -> int:
+        # index of the first cell holding value, or -1
+        return self.cells.find(value, self.origin)
+
+    def row(self, y: int) -> bytes:
+        start = self.index(y, 0)
+        return self.cells[start:start + self.width]
+
+    def rows(self) -> List[bytes]:
+        return [self.row(y) for y in range(self.height)]
+
+    def line(self, y: int, x: int, dy: int, dx: int, length: int) -> bytes:
+        # the length cells starting at (y, x) going in direction (dy, dx)
+        if length <= 0:
+            return b""
+        start = self.index(y, x)
+        step = dy * self.stride + dx
+        end = start + (length - 1) * step
+        if step < 0:
+            return self.cells[end:start + 1:-step][::-1]
+        return self.cells[start:end + 1:step]
+
+    def array(self) -> "np.ndarray":
+        # (height, width) view of the cells, without copying
+        cells = np.frombuffer(self.cells, dtype=np.uint8)
+        return np.lib.stride_tricks.as_strided(
+            cells[self.origin:], shape=(self.height, self.width),
+            strides=(self.stride, 1), writeable=False)
@@ -0,0 +1,83 @@
+import re
+from array import array
+from typing import List, Sequence, Tuple
+
+from sidecar import cached_arrays
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def read_bytes(file_name: str) -> bytes:
+    with open(file_name, "rb") as file:
+        return file.read()
+
+
+def to_spaces(data: bytes, separators: bytes) -> bytes:
+    # separators such as "|", "," or ":" become plain whitespace
+    if len(separators) == 0:
+        return data
+    return data.translate(bytes.maketrans(separators, b" " * len(separators)))
+
+
+# any shorter number fits in an int64
+LONG_NUMBER = re.compile(rb"\d{19}")
+
+
+def exact_ints(data: bytes) -> Sequence[int]:
+    values: List[int] = [int(token) for token in data.split()]
+    try:
+        return array('q', values)
+    except OverflowError:  # past 64 bits only a list holds them
+        return values
+
+
+def parse_ints(data: bytes, separators: bytes = b"") -> Sequence[int]:
+    # every integer in data, in order, as one flat array('q'), or as a list
+    # of exact ints when some do not fit in 64 bits
+    data = to_spaces(data, separators)
+    # fromstring clamps numbers past 64 bits without a word
+    if np is None or LONG_NUMBER.search(data) is not None:
+        return exact_ints(data)
+    values: array = array('q')
+    # fromstring reads a whitespace only buffer as a single 0
+    if len(data.strip()) != 0:
+        values.frombytes(np.fromstring(data, dtype=np.int64, sep=" ").tobytes())
+    return values
+
+
+def parse_int_rows(data: bytes, separators: bytes = b"") -> Tuple[Sequence[int], array]:
+    # (values, offsets) where non-blank line i holds
+    # values[offsets[i]:offsets[i + 1]]
+    data = to_spaces(data, separators)
+    values = parse_ints(data)
+    offsets: array = array('q', [0])
+    if np is not None:
+        text = np.frombuffer(data, dtype=np.uint8)
+        in_word = text > ord(" ")
+        word_starts = np.flatnonzero(in_word & ~np.concatenate(([False], in_word[:-1])))
+        newlines = np.flatnonzero(text == ord("\n"))
+        # line of every number, then how many numbers each non-blank line has
+        _, counts = np.unique(np.searchsorted(newlines, word_starts), return_counts=True)
+        offsets.frombytes(np.cumsum(counts, dtype=np.int64).tobytes())
+        return (values, offsets)
+    for line in data.split(b"\n"):
+        count = len(line.split())
+        if count != 0:
+            offsets.append(offsets[-1] + count)
+    return (values, offsets)
+
+
+def read_ints(file_name: str, separators: bytes = b"") -> Sequence[int]:
+    def parse() -> List[Sequence[int]]:
+        return [parse_ints(read_bytes(file_name), separators)]
+    return cached_arrays(file_name, f"ints:{separators.hex()}", parse)[0]
+
+
+def read_int_rows(file_name: str, separators: bytes = b"") -> Tuple[Sequence[int], array]:
+    def parse() -> List[Sequence[int]]:
+        return list(parse_int_rows(read_bytes(file_name), separators))
+    values, offsets = cached_arrays(file_name, f"int_rows:{separators.hex()}", parse)
+    return (values, offsets)
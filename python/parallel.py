@@ -0,0 +1,42 @@
+import itertools
+import os
+from collections import deque
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(function: Callable[[List], Any], items: Iterable, chunk_size: int,
+               workers: Optional[int] = None,
+               initializer: Optional[Callable] = None, initargs: Tuple = (),
+               local: Optional[Callable[[List], Any]] = None) -> Iterator[Any]:
+    # function applied to every chunk of items, in order, across a pool of
+    # workers; local does the same in this process (default: function) and
+    # is used when there is one worker or everything fits in one chunk
+    workers = workers or os.cpu_count() or 1
+    local = local or function
+    chunks = chunked(items, chunk_size)
+    first = next(chunks, [])
+    if workers == 1 or len(first) < chunk_size:
+        for chunk in itertools.chain([first], chunks):
+            yield local(chunk)
+        return
+    # keep a bounded number of chunks in flight so the input is only read
+    # as fast as the workers get through it
+    pending: Deque[AsyncResult] = deque()
+    with Pool(workers, initializer=initializer, initargs=initargs) as pool:
+        for chunk in itertools.chain([first], chunks):
+            pending.append(pool.apply_async(function, (chunk,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
@@ -0,0 +1,105 @@
+import hashlib
+import inspect
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from functools import lru_cache
+from types import ModuleType
+from typing import Callable, List, Sequence
+
+from cache import file_digest, source_files
+
+
+# the runner moves this under its --cache-dir, where the answer cache's
+# size budget also covers the sidecars
+SIDECAR_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                ".aoc_cache", "parsed")
+# format tag, bumped whenever the layout below changes
+MAGIC: bytes = b"AOCQ0001"
+# off unless a caller opts in, as the runner does without --no-cache, so
+# importing a solver never leaves files behind
+enabled: bool = False
+
+
+@lru_cache(maxsize=None)
+def module_digest(module: ModuleType) -> str:
+    # sources do not change while the process runs, so each is hashed once
+    digest = hashlib.sha256()
+    for source in source_files(module):
+        with open(source, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def sidecar_path(file_name: str, kind: str, parse: Callable) -> str:
+    # keyed by the input and by the source of the module doing the parsing
+    digest = hashlib.sha256(f"{kind}\n".encode())
+    digest.update(file_digest(file_name).encode())
+    digest.update(module_digest(inspect.getmodule(parse)).encode())
+    return os.path.join(SIDECAR_DIR, f"{digest.hexdigest()}.bin")
+
+
+def write_arrays(path: str, arrays: Sequence[Sequence[int]]) -> None:
+    # MAGIC, the number of arrays and their lengths, then every array as
+    # native int64s back to back
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(handle, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack(f"={len(arrays) + 1}q", len(arrays), *map(len, arrays)))
+        for values in arrays:
+            file.write(values.tobytes() if isinstance(values, array) and values.typecode == 'q'
+                       else array('q', values).tobytes())
+    os.replace(temporary, path)
+
+
+def map_arrays(path: str) -> List[array]:
+    # each array is copied once, straight out of the mapping
+    with open(path, "rb") as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping, \
+            memoryview(mapping) as view:
+        if mapping[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a sidecar")
+        offset = len(MAGIC)
+        (count,) = struct.unpack_from("=q", mapping, offset)
+        lengths = struct.unpack_from(f"={count}q", mapping, offset + 8)
+        offset += 8 * (count + 1)
+        arrays: List[array] = []
+        for length in lengths:
+            if offset + 8 * length > len(mapping):
+                raise ValueError(f"{path} is truncated")
+            values = array('q')
+            values.frombytes(view[offset:offset + 8 * length])
+            arrays.append(values)
+            offset += 8 * length
+        return arrays
+
+
+def cached_arrays(file_name: str, kind: str,
+                  parse: Callable[[], Sequence[array]]) -> List[array]:
+    # the int64 arrays parse() makes of file_name, read back from the
+    # sidecar written the first time instead of parsing the text again
+    if not enabled:
+        return list(parse())
+    path = sidecar_path(file_name, kind, parse)
+    try:
+        arrays = map_arrays(path)
+    except (OSError, ValueError, struct.error):
+        pass
+    else:
+        try:  # the modification time is the last use, as for cached answers
+            os.utime(path)
+        except OSError:
+            pass
+        return arrays
+    arrays = list(parse())
+    # numbers past 64 bits come as lists of exact ints, which stay text
+    if not all(isinstance(values, array) for values in arrays):
+        return arrays
+    try:
+        write_arrays(path, arrays)
+    except OSError:  # a read only checkout still gets its answers
+        pass
+    return arrays
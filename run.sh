@@ -1,27 +1,8 @@
 #!/usr/bin/env bash
 
 if [[ $1 == "python" ]]; then
-    # run python files
-    python_files=$(find python -maxdepth 1 -type f)
-    for file in $python_files
-    do
-        if [[ $2 == "test" ]]; then
-            failed=$(python3 $file test &>/dev/null && echo $?)
-            if [[ $failed != 0 ]]; then
-                echo "$file test failed"
-            else
-                echo "$file tested successfully"
-            fi
-        fi
-        if [[ $2 == "input" ]]; then
-            failed=$(python3 $file input &>/dev/null && echo $?)
-            if [[ $failed != 0 ]]; then
-                echo "$file compilation or execution failed"
-            else
-                echo "$file compiled and executed successfully"
-            fi
-        fi
-    done
+    # run every python day in a single interpreter
+    python3 python/aoc.py --mode "${2:-test}" "${@:3}"
 fi
 
 if [[ $1 == "zig" ]]; then
@@ -30,16 +11,14 @@ if [[ $1 == "zig" ]]; then
     for file in $zig_files
     do
         if [[ $2 == "test" ]]; then
-            failed=$(zig test $file &>/dev/null && echo $?)
-            if [[ $failed != 0 ]]; then
+            if ! zig test $file &>/dev/null; then
                 echo "$file test failed"
             else
                 echo "$file tested successfully"
             fi
         fi
         if [[ $2 == "input" ]]; then
-            failed=$(zig run -ODebug $file &>/dev/null && echo $?)
-            if [[ $failed != 0 ]]; then
+            if ! zig run -ODebug $file &>/dev/null; then
                 echo "$file compilation or execution failed"
             else
                 echo "$file compiled and executed successfully"